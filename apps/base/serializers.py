@@ -1,3 +1,5 @@
+from copy import copy, deepcopy
+
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from .models import (
@@ -8,6 +10,81 @@ from .models import (
 User = get_user_model()
 
 
+class CachedModelSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer that builds its field set once per class.
+
+    DRF rebuilds (and deep-copies) every field on each instantiation; here the
+    built fields are cached and each instance gets shallow copies instead.
+    Nested serializers are still deep-copied since they carry their own state.
+    Only use for serializers whose fields don't depend on context or request.
+    """
+    _fields_cache = {}
+
+    def get_fields(self):
+        cls = type(self)
+        fields = CachedModelSerializer._fields_cache.get(cls)
+        if fields is None:
+            fields = CachedModelSerializer._fields_cache[cls] = super().get_fields()
+        return {
+            name: deepcopy(field) if isinstance(field, serializers.BaseSerializer) else copy(field)
+            for name, field in fields.items()
+        }
+
+
+class ChoiceLabelField(serializers.ReadOnlyField):
+    """
+    Read-only label for a choice value, e.g. ChoiceLabelField(Model.Status.choices, source='status').
+
+    Looks the label up in a dict built once, instead of calling
+    get_FOO_display() on every row.
+    """
+    def __init__(self, choices, **kwargs):
+        self.labels = dict(choices)
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return self.labels.get(value, value)
+
+
+class ObjectCountField(serializers.ReadOnlyField):
+    """
+    Read-only count rendered from a queryset annotation, e.g. ObjectCountField('_total_members').
+
+    Opt-in: drop it from the output unless it is named in ``?fields=`` and have
+    the view annotate only the requested ones (see requested_count_annotations()).
+    """
+    def __init__(self, annotation, **kwargs):
+        self.annotation = annotation
+        kwargs['source'] = annotation
+        super().__init__(**kwargs)
+
+
+def requested_fields(request):
+    """Field names from a ``?fields=a,b`` query parameter, or an empty set."""
+    if request is None:
+        return set()
+    return {name.strip() for name in request.query_params.get('fields', '').split(',') if name.strip()}
+
+
+def without_unrequested_counts(fields, request):
+    """Drop the ObjectCountFields from a serializer's fields unless ``?fields=`` asks for them."""
+    requested = requested_fields(request)
+    return {
+        name: field for name, field in fields.items()
+        if not isinstance(field, ObjectCountField) or name in requested
+    }
+
+
+def requested_count_annotations(serializer_class, request):
+    """Annotation names for the ObjectCountFields of serializer_class named in ``?fields=``."""
+    requested = requested_fields(request)
+    return [
+        field.annotation for name, field in serializer_class._declared_fields.items()
+        if isinstance(field, ObjectCountField) and name in requested
+    ]
+
+
 class EmailConfigSerializer(serializers.ModelSerializer):
     """Serializer for EmailConfig model."""
     class Meta:
@@ -1,11 +1,45 @@
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+
+_UNSET = object()
+
+
 def get_request_branch_id(request):
     """
     Extract branch id from request headers, query params, or POST data.
     Priority: x-branch-id header > HTTP_X_BRANCH_ID > query param > POST data
+    The result is cached on the request so repeated calls don't re-parse it.
     """
-    return (
-        request.headers.get('x-branch-id')
-        or request.META.get('HTTP_X_BRANCH_ID')
-        or request.query_params.get('branch_id')
-        or request.data.get('branch_id')
-    ) 
\ No newline at end of file
+    branch_id = getattr(request, '_cached_branch_id', _UNSET)
+    if branch_id is _UNSET:
+        branch_id = (
+            request.headers.get('x-branch-id')
+            or request.META.get('HTTP_X_BRANCH_ID')
+            or request.query_params.get('branch_id')
+            or request.data.get('branch_id')
+        )
+        request._cached_branch_id = branch_id
+    return branch_id
+
+
+def stream_serialized(queryset, serializer_class, context=None, chunk_size=500):
+    """
+    Stream a queryset as a JSON array, serializing one row at a time.
+    Rows are fetched with iterator(chunk_size=...) so memory stays bounded
+    by the chunk size instead of the size of the result set.
+    """
+    def generate():
+        yield b'['
+        first = True
+        for obj in queryset.iterator(chunk_size=chunk_size):
+            if not first:
+                yield b','
+            first = False
+            data = serializer_class(obj, context=context).data
+            yield json.dumps(data, cls=JSONEncoder).encode('utf-8')
+        yield b']'
+
+    return StreamingHttpResponse(generate(), content_type='application/json')
@@ -0,0 +1,58 @@
+import django_filters
+
+from apps.branches.models import Branch
+from .models import Product, InventoryAdjustment, Allergy, MenuItem
+
+
+def branch_queryset(request):
+    """Shared, narrow Branch queryset for branch lookup filters."""
+    return Branch.objects.only('id', 'name')
+
+
+class ProductFilter(django_filters.FilterSet):
+    product_type = django_filters.ChoiceFilter(choices=Product.PRODUCT_TYPES)
+    branch_stock__branch = django_filters.ModelChoiceFilter(queryset=branch_queryset)
+
+    class Meta:
+        model = Product
+        fields = {
+            'category': ['exact', 'isnull'],
+            'supplier': ['exact', 'isnull'],
+            'is_active': ['exact'],
+            'is_available_for_sale': ['exact'],
+            'is_available_for_recipes': ['exact'],
+            'cost_price': ['gte', 'lte'],
+            'selling_price': ['gte', 'lte'],
+        }
+
+
+class InventoryAdjustmentFilter(django_filters.FilterSet):
+    status = django_filters.ChoiceFilter(choices=InventoryAdjustment.STATUS_CHOICES)
+    branch = django_filters.ModelChoiceFilter(queryset=branch_queryset)
+
+    class Meta:
+        model = InventoryAdjustment
+        fields = {
+            'product': ['exact'],
+            'branch_stock': ['exact'],
+            'requested_by': ['exact'],
+            'reviewed_by': ['exact', 'isnull'],
+            'created_at': ['date__gte', 'date__lte', 'date__range'],
+        }
+
+
+class MenuItemFilter(django_filters.FilterSet):
+    # Back-compat alias for clients still sending ?menu_id=
+    menu_id = django_filters.NumberFilter(field_name='menu')
+
+    class Meta:
+        model = MenuItem
+        fields = ['menu', 'category', 'is_available', 'is_featured']
+
+
+class AllergyFilter(django_filters.FilterSet):
+    severity = django_filters.ChoiceFilter(choices=Allergy.Severity.choices)
+
+    class Meta:
+        model = Allergy
+        fields = ['severity']
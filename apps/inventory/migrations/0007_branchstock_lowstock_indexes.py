@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_menuitem_image'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='branchstock',
+            index=models.Index(fields=['branch', 'is_active', 'current_stock', 'reorder_level'], name='bs_lowstock_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='branchstock',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['branch', 'current_stock'], name='bs_active_idx'),
+        ),
+    ]
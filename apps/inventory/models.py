@@ -1,13 +1,15 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.fields import GenericForeignKey
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import models, transaction
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 from decimal import Decimal, ROUND_HALF_UP
-from django.db.models import Q, F, Sum
+from django.db.models import Q, F, Sum, Exists, OuterRef
+from django.db.models.functions import Upper
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from apps.base.models import BaseNameDescriptionModel, TimestampedModel , SoftDeleteModel
@@ -110,6 +112,10 @@ class MenuItem(TimestampedModel, SoftDeleteModel):
         verbose_name_plural = _('menu items')
         ordering = ('display_order', 'name')
         unique_together = (('menu', 'name'),)
+        indexes = [
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='menuitem_name_trgm'),
+            GinIndex(OpClass(Upper('description'), name='gin_trgm_ops'), name='menuitem_desc_trgm'),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.menu.name}"
@@ -150,6 +156,15 @@ class MenuItem(TimestampedModel, SoftDeleteModel):
         
         return unavailable_ingredients
 
+    def unavailable_ingredients(self, branch):
+        """Lazy queryset of recipe ingredients the branch lacks enough stock for."""
+        enough_stock = BranchStock.objects.filter(
+            product=OuterRef('ingredient'),
+            branch=branch,
+            current_stock__gte=OuterRef('quantity')
+        )
+        return RecipeIngredient.objects.filter(recipe__menu_item=self).exclude(Exists(enough_stock))
+
     def update_allergens_from_recipe(self):
         """Update allergens as the union of all ingredient allergens in the recipe."""
         if hasattr(self, 'recipe') and self.recipe:
@@ -277,14 +292,17 @@ class ProductImage(TimestampedModel, SoftDeleteModel):
         return f"{self.product.name} - {self.image.url if self.image else None}"
     
     def save(self, *args, **kwargs):
-        # If this image is being set as default, unset other defaults for this product
-        if self.is_default:
+        if not self.is_default:
+            return super().save(*args, **kwargs)
+        # Unset other defaults and save in one transaction; locking the product row
+        # serializes concurrent default changes so a product never ends up with two
+        with transaction.atomic():
+            list(Product.objects.select_for_update().filter(pk=self.product_id).values_list('id', flat=True))
             ProductImage.objects.filter(
-                product=self.product,
+                product_id=self.product_id,
                 is_default=True
             ).exclude(pk=self.pk).update(is_default=False)
-        
-        super().save(*args, **kwargs)
+            super().save(*args, **kwargs)
     
     class Meta:
         verbose_name = _('product image')
@@ -416,6 +434,9 @@ class Product(BarcodeMixin, BaseNameDescriptionModel, TimestampedModel, SoftDele
             models.Index(fields=['barcode'], name='product_barcode_idx'),
             models.Index(fields=['is_active'], name='product_active_idx'),
             models.Index(fields=['product_type'], name='product_type_idx'),
+            # Trigram indexes on UPPER(...) match the SQL Django emits for icontains
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='product_name_trgm'),
+            GinIndex(OpClass(Upper('description'), name='gin_trgm_ops'), name='product_desc_trgm'),
         ]
     
     def __str__(self):
@@ -555,6 +576,11 @@ class BranchStock(TimestampedModel, SoftDeleteModel):
         constraints = [
             models.UniqueConstraint(fields=['menu_item', 'branch'], name='unique_menuitem_branch', condition=~models.Q(menu_item=None)),
         ]
+        indexes = [
+            # Low-stock predicates used by the inventory stats and product list
+            models.Index(fields=['branch', 'is_active', 'current_stock', 'reorder_level'], name='bs_lowstock_idx'),
+            models.Index(fields=['branch', 'current_stock'], condition=Q(is_active=True), name='bs_active_idx'),
+        ]
 
     def __str__(self):
         owner_name = self.product.name if self.product else self.menu_item.name
@@ -724,6 +750,9 @@ class InventoryTransaction(BaseNameDescriptionModel, TimestampedModel, SoftDelet
         verbose_name = _('inventory transaction')
         verbose_name_plural = _('inventory transactions')
         ordering = ('-created_at',)
+        indexes = [
+            models.Index(fields=['branch', '-created_at', 'id'], name='invtx_branch_created_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         """Save inventory transaction."""
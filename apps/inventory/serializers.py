@@ -277,6 +277,12 @@ class InventoryTransactionSerializer(serializers.ModelSerializer):
             
         return super().create(validated_data)
 
+class AdjustStockSerializer(serializers.Serializer):
+    """Validates the payload of the product adjust_stock action."""
+    quantity = serializers.IntegerField()
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+    branch_id = serializers.IntegerField(required=False, allow_null=True)
+
 class BatchSerializer(serializers.ModelSerializer):
     """Serializer for Batch model with product details."""
     product_name = serializers.CharField(source='product.name', read_only=True)
@@ -542,6 +548,18 @@ class MenuItemSerializer(serializers.ModelSerializer):
             return obj.check_ingredient_availability(request.branch)
         return []
 
+class PopularMenuItemSerializer(MenuItemSerializer):
+    """Menu item with the `sales_count` annotation from the popular query."""
+    sales_count = serializers.IntegerField(read_only=True)
+    # The popular list is cached and shared, so don't build the URL from the request's host
+    image = serializers.SerializerMethodField()
+    
+    class Meta(MenuItemSerializer.Meta):
+        fields = MenuItemSerializer.Meta.fields + ['sales_count']
+    
+    def get_image(self, obj):
+        return obj.image.url if obj.image else None
+
 class MenuItemCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating menu items with images and recipes."""
     allergens = serializers.PrimaryKeyRelatedField(queryset=Allergy.objects.all(), many=True, required=False)
@@ -864,3 +882,29 @@ class MinimalCatalogMenuItemSerializer(serializers.ModelSerializer):
             if stock_obj:
                 return float(stock_obj.current_stock)
         return None
+
+# Columns shared by the product and menu item sides of the catalog UNION
+CATALOG_ROW_FIELDS = (
+    'id', 'name', 'description', 'category', 'category_name', 'selling_price', 'cost_price',
+    'track_inventory', 'item_kind', 'available', 'stock', 'image_path'
+)
+
+class CatalogRowSerializer(serializers.Serializer):
+    """Serializes the projected catalog rows (dicts) built by CatalogView."""
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    description = serializers.CharField()
+    category = serializers.IntegerField(allow_null=True)
+    category_name = serializers.CharField(allow_null=True)
+    selling_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    cost_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    type = serializers.CharField(source='item_kind')
+    default_image = serializers.SerializerMethodField()
+    track_inventory = serializers.BooleanField()
+    stock = serializers.FloatField(allow_null=True)
+    is_available = serializers.BooleanField(source='available')
+
+    def get_default_image(self, row):
+        if not row['image_path']:
+            return None
+        return ProductImage._meta.get_field('image').storage.url(row['image_path'])
@@ -1,6 +1,7 @@
 import logging
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from django.core.cache import cache
 from django.db import transaction
 from django.utils import timezone
 
@@ -10,6 +11,19 @@ from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
+POPULAR_MENU_ITEMS_VERSION_KEY = 'popular_menu_items:version'
+
+@receiver(post_save, sender='sales.Order')
+def invalidate_popular_menu_items(sender, instance, **kwargs):
+    """Expire the cached popular menu items whenever an order is saved as completed."""
+    if instance.status != 'completed':
+        return
+    try:
+        cache.incr(POPULAR_MENU_ITEMS_VERSION_KEY)
+    except ValueError:
+        # Version key missing or evicted; any fresh value invalidates old entries
+        cache.set(POPULAR_MENU_ITEMS_VERSION_KEY, 2, None)
+
 @receiver(post_save, sender=Product)
 def create_branch_stock_for_product(sender, instance, created, **kwargs):
     """Automatically create BranchStock entries when a product is created. Also logs initial stock transaction if provided."""
@@ -1,3 +1,115 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.branches.models import Branch, Company
+from .models import BranchStock, Category, Menu, MenuItem, Product, UnitOfMeasure
+
+User = get_user_model()
+
+
+class CatalogViewTests(APITestCase):
+    """The catalog pages products and menu items as one UNION ALL, ordered by category then name."""
+
+    def setUp(self):
+        company = Company.objects.create(
+            name='Kitchen Bloom', legal_name='Kitchen Bloom Ltd', primary_contact_email='info@example.com',
+            primary_contact_phone='+254700000000', address='1 Main St', city='Nairobi', state='Nairobi',
+            postal_code='00100'
+        )
+        self.branch = Branch.objects.create(name='Main', company=company, code='MAIN', address='1 Main St', city='Nairobi')
+        other_branch = Branch.objects.create(name='Other', company=company, code='OTH', address='2 Main St', city='Nairobi')
+        unit = UnitOfMeasure.objects.create(code='pcs', name='Piece', symbol='pcs')
+        bakery = Category.objects.create(name='Bakery')
+        drinks = Category.objects.create(name='Drinks')
+
+        # Saving a product gives it a BranchStock row in every active branch
+        bread = Product.objects.create(
+            name='Bread', SKU='BRD-1', category=bakery, unit_of_measure=unit,
+            cost_price=Decimal('40.00'), selling_price=Decimal('60.00')
+        )
+        Product.objects.create(
+            name='Soda', SKU='SOD-1', category=drinks, unit_of_measure=unit,
+            cost_price=Decimal('30.00'), selling_price=Decimal('50.00')
+        )
+        BranchStock.objects.filter(product=bread, branch=self.branch).update(current_stock=12)
+
+        # bulk_create skips the post_save signal that adds a Product per menu item
+        menu = Menu.objects.create(name='Main menu', branch=self.branch)
+        other_menu = Menu.objects.create(name='Other menu', branch=other_branch)
+        MenuItem.objects.bulk_create([
+            MenuItem(menu=menu, name='Cake', category=bakery, cost_price=Decimal('80.00'), selling_price=Decimal('150.00')),
+            MenuItem(menu=menu, name='Juice', category=drinks, cost_price=Decimal('20.00'), selling_price=Decimal('70.00')),
+            MenuItem(menu=other_menu, name='Tea', category=drinks, cost_price=Decimal('10.00'), selling_price=Decimal('40.00')),
+        ])
+
+        self.bakery, self.unit = bakery, unit
+        self.user = User.objects.create_user(email='catalog@example.com', password='testpass123', first_name='Cat', last_name='Alog')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('catalog')
+
+    def get(self, **params):
+        return self.client.get(self.url, {'branch_id': self.branch.pk, **params})
+
+    def test_requires_branch(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_interleaves_products_and_menu_items_by_category(self):
+        response = self.get(page_size=10)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 4)
+        results = response.data['results']
+        self.assertEqual(list(results), ['Bakery', 'Drinks'])
+        self.assertEqual(
+            [(item['name'], item['type']) for item in results['Bakery']],
+            [('Bread', 'product'), ('Cake', 'menu_item')]
+        )
+        self.assertEqual(
+            [(item['name'], item['type']) for item in results['Drinks']],
+            [('Juice', 'menu_item'), ('Soda', 'product')]
+        )
+
+    def test_row_values(self):
+        bread, cake = self.get(page_size=10).data['results']['Bakery']
+        self.assertEqual(bread['stock'], 12.0)
+        self.assertEqual(bread['selling_price'], '60.00')
+        self.assertTrue(bread['is_available'])
+        self.assertIsNone(bread['default_image'])
+        self.assertIsNone(cake['stock'])
+        self.assertEqual(cake['selling_price'], '150.00')
+
+    def test_paginates_the_combined_rows(self):
+        response = self.get(page=2, page_size=3)
+        self.assertEqual(response.data['count'], 4)
+        self.assertEqual(
+            {category: [item['name'] for item in items] for category, items in response.data['results'].items()},
+            {'Drinks': ['Soda']}
+        )
+
+    def test_filters_apply_to_both_sides(self):
+        response = self.get(category='Drinks', page_size=10)
+        self.assertEqual(response.data['count'], 2)
+        response = self.get(search='ca', page_size=10)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results']['Bakery'][0]['name'], 'Cake')
+
+    def test_same_named_product_and_menu_item_split_across_pages(self):
+        # The menu item signal creates a same-named product in the same category
+        Product.objects.create(
+            name='Cake', SKU='MI-CAKE', category=self.bakery, unit_of_measure=self.unit,
+            cost_price=Decimal('80.00'), selling_price=Decimal('150.00')
+        )
+        rows = []
+        for page in (1, 2, 3):
+            response = self.get(page=page, page_size=2)
+            self.assertEqual(response.data['count'], 5)
+            rows += [(item['name'], item['type']) for items in response.data['results'].values() for item in items]
+        self.assertEqual(rows, [
+            ('Bread', 'product'), ('Cake', 'menu_item'),
+            ('Cake', 'product'), ('Juice', 'menu_item'),
+            ('Soda', 'product'),
+        ])
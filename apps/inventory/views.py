@@ -1,11 +1,17 @@
 from datetime import timedelta
+from functools import lru_cache
 from rest_framework import viewsets, permissions, status, filters
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import F, Sum, Q, Count
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Sum, Q, Count, Exists, OuterRef, Subquery, Value, Prefetch, CharField, DecimalField
+from django.db.models.functions import Concat, Trim
 from django.utils import timezone
 from rest_framework.views import APIView
+from rest_framework.pagination import CursorPagination
 import json
 
 from .models import (
@@ -22,9 +28,20 @@ from .serializers import (
     RecipeSerializer, RecipeIngredientSerializer, AllergySerializer,
     ModifierSerializer, ModifierOptionSerializer, MenuItemModifierSerializer,
     StockCountSerializer, PurchaseOrderSerializer, StockTransferSerializer,
-    MinimalCatalogProductSerializer, MinimalCatalogMenuItemSerializer
+    CATALOG_ROW_FIELDS, CatalogRowSerializer, AdjustStockSerializer,
+    PopularMenuItemSerializer
 )
-from apps.base.utils import get_request_branch_id
+from .filters import ProductFilter, InventoryAdjustmentFilter, AllergyFilter, MenuItemFilter
+from .signals import POPULAR_MENU_ITEMS_VERSION_KEY
+from apps.base.utils import get_request_branch_id, stream_serialized
+
+POPULAR_MENU_ITEMS_CACHE_TIMEOUT = 60
+
+
+class InventoryCursorPagination(CursorPagination):
+    """Keyset pagination for the append-heavy inventory transaction log."""
+    ordering = '-created_at'
+    page_size = 50
 
 
 class CategoryViewSet(viewsets.ModelViewSet):
@@ -69,7 +86,7 @@ class AllergyViewSet(viewsets.ModelViewSet):
     serializer_class = AllergySerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['severity']
+    filterset_class = AllergyFilter
     search_fields = ['name', 'description', 'common_in']
     ordering_fields = ['name', 'severity', 'created_at']
 
@@ -81,19 +98,14 @@ class ProductViewSet(viewsets.ModelViewSet):
     serializer_class = ProductSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = {
-        'category': ['exact', 'isnull'],
-        'supplier': ['exact', 'isnull'],
-        'is_active': ['exact'],
-        'product_type': ['exact'],
-        'is_available_for_sale': ['exact'],
-        'is_available_for_recipes': ['exact'],
-        'cost_price': ['gte', 'lte'],
-        'selling_price': ['gte', 'lte'],
-        'branch_stock__branch': ['exact'],
-    }
+    filterset_class = ProductFilter
     search_fields = ['name', 'SKU', 'barcode', 'description']
     ordering_fields = ['name', 'cost_price', 'selling_price', 'created_at']
+    # Columns ProductSerializer never reads; skipped on the lightweight list actions
+    list_deferred_fields = (
+        'notes', 'track_batches', 'track_expiry', 'kds_station_type',
+        'track_inventory', 'deleted_at', 'deleted_by'
+    )
     
     def get_serializer_class(self):
         """Use ProductCreateSerializer for creation."""
@@ -103,17 +115,23 @@ class ProductViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         queryset = super().get_queryset()
+        # EXISTS semi-joins instead of JOIN + DISTINCT over branch_stock
         branch_id = get_request_branch_id(self.request)
         if branch_id:
-            queryset = queryset.filter(branch_stock__branch_id=branch_id).distinct()
+            queryset = queryset.filter(Exists(
+                BranchStock.objects.filter(product=OuterRef('pk'), branch_id=branch_id)
+            ))
         
         # Filter by stock level if specified
         stock_level = self.request.query_params.get('stock_level')
         if stock_level == 'low':
-            queryset = queryset.filter(
-                branch_stock__current_stock__lte=F('branch_stock__reorder_level'),
-                branch_stock__is_active=True
-            ).distinct()
+            queryset = queryset.filter(Exists(
+                BranchStock.objects.filter(
+                    product=OuterRef('pk'),
+                    current_stock__lte=F('reorder_level'),
+                    is_active=True
+                )
+            ))
         
         # Filter by product type
         product_type = self.request.query_params.get('product_type')
@@ -178,59 +196,46 @@ class ProductViewSet(viewsets.ModelViewSet):
         Adjust product stock by a specific amount.
         """
         product = self.get_object()
-        quantity = request.data.get('quantity')
-        notes = request.data.get('notes', '')
-        branch_id = request.data.get('branch_id')
-        
-        if quantity is None:
-            return Response(
-                {'detail': 'Quantity is required'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        try:
-            quantity = int(quantity)
-        except (ValueError, TypeError):
-            return Response(
-                {'detail': 'Quantity must be an integer'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        serializer = AdjustStockSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        quantity = serializer.validated_data['quantity']
+        notes = serializer.validated_data['notes']
+        branch_id = serializer.validated_data.get('branch_id')
         
-        # Get or create branch stock
+        branch_stocks = BranchStock.objects.filter(product=product)
         if branch_id:
-            try:
-                branch_stock = BranchStock.objects.get(product=product, branch_id=branch_id)
-            except BranchStock.DoesNotExist:
-                return Response(
-                    {'detail': 'Product not available at this branch'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-        else:
-            # Use the first available branch stock
-            branch_stock = product.branch_stock.first()
+            branch_stocks = branch_stocks.filter(branch_id=branch_id)
+        
+        with transaction.atomic():
+            # Use the requested branch, or the first available branch stock
+            branch_stock = branch_stocks.values('id', 'branch_id').first()
             if not branch_stock:
+                detail = 'Product not available at this branch' if branch_id else 'Product not available at any branch'
+                return Response({'detail': detail}, status=status.HTTP_400_BAD_REQUEST)
+            
+            # Apply the delta in the database so concurrent adjustments can't lose updates
+            updated = BranchStock.objects.filter(
+                id=branch_stock['id'],
+                current_stock__gte=-quantity
+            ).update(current_stock=F('current_stock') + quantity, updated_at=timezone.now())
+            if not updated:
                 return Response(
-                    {'detail': 'Product not available at any branch'},
+                    {'detail': 'Adjustment would make stock negative'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-        
-        # Create inventory transaction
-        transaction = InventoryTransaction.objects.create(
-            product=product,
-            branch=branch_stock.branch,
-            branch_stock=branch_stock,
-            transaction_type='adjustment',
-            quantity=quantity,
-            notes=notes,
-            created_by=request.user
-        )
-        
-        # Update branch stock
-        branch_stock.current_stock += quantity
-        branch_stock.save()
+            
+            inventory_transaction = InventoryTransaction.objects.create(
+                product=product,
+                branch_id=branch_stock['branch_id'],
+                branch_stock_id=branch_stock['id'],
+                transaction_type='adjustment',
+                quantity=quantity,
+                notes=notes,
+                created_by=request.user
+            )
         
         return Response(
-            InventoryTransactionSerializer(transaction).data,
+            InventoryTransactionSerializer(inventory_transaction).data,
             status=status.HTTP_200_OK
         )
 
@@ -241,9 +246,8 @@ class ProductViewSet(viewsets.ModelViewSet):
             product_type='ingredient',
             is_available_for_recipes=True,
             is_active=True
-        )
-        serializer = self.get_serializer(ingredients, many=True)
-        return Response(serializer.data)
+        ).defer(*self.list_deferred_fields)
+        return stream_serialized(ingredients, self.get_serializer_class(), self.get_serializer_context())
     
     @action(detail=False, methods=['get'])
     def beverages(self, request):
@@ -251,9 +255,8 @@ class ProductViewSet(viewsets.ModelViewSet):
         beverages = self.get_queryset().filter(
             product_type='beverage',
             is_active=True
-        )
-        serializer = self.get_serializer(beverages, many=True)
-        return Response(serializer.data)
+        ).defer(*self.list_deferred_fields)
+        return stream_serialized(beverages, self.get_serializer_class(), self.get_serializer_context())
     
     @action(detail=False, methods=['get'])
     def finished_products(self, request):
@@ -261,9 +264,8 @@ class ProductViewSet(viewsets.ModelViewSet):
         finished_products = self.get_queryset().filter(
             product_type='finished_product',
             is_active=True
-        )
-        serializer = self.get_serializer(finished_products, many=True)
-        return Response(serializer.data)
+        ).defer(*self.list_deferred_fields)
+        return stream_serialized(finished_products, self.get_serializer_class(), self.get_serializer_context())
     
     @action(detail=True, methods=['get'])
     def related_recipes(self, request, pk=None):
@@ -299,6 +301,20 @@ class ProductViewSet(viewsets.ModelViewSet):
             
             branch_id = get_request_branch_id(request)
             
+            # Branches without any stock rows can only produce zeros
+            if branch_id and not BranchStock.objects.filter(branch_id=branch_id).exists():
+                return Response({
+                    'total_items': 0,
+                    'items_change': 0,
+                    'low_stock_items': 0,
+                    'low_stock_percentage': 0,
+                    'out_of_stock_items': 0,
+                    'out_of_stock_percentage': 0,
+                    'inventory_value': 0.0,
+                    'value_change': 0,
+                    'branch_id': branch_id
+                })
+            
             # Base queryset for products
             products = Product.objects.filter(is_active=True)
             branch_stocks = BranchStock.objects.filter(is_active=True, product__is_active=True)
@@ -311,20 +327,20 @@ class ProductViewSet(viewsets.ModelViewSet):
             # Calculate total items
             total_items = products.count()
             
-            # Calculate low stock items (current stock <= reorder level * 1.5)
-            low_stock_items = branch_stocks.filter(
-                current_stock__gt=0,
-                reorder_level__gt=0,
-                current_stock__lte=F('reorder_level') * 1.5
-            ).count()
-            
-            # Calculate out of stock items
-            out_of_stock_items = branch_stocks.filter(current_stock__lte=0).count()
-            
-            # Calculate inventory value
-            inventory_value = branch_stocks.aggregate(
+            # Low stock (current stock <= reorder level * 1.5), out of stock and
+            # inventory value in a single aggregate query
+            stock_totals = branch_stocks.aggregate(
+                low_stock_items=Count('id', filter=Q(
+                    current_stock__gt=0,
+                    reorder_level__gt=0,
+                    current_stock__lte=F('reorder_level') * 1.5
+                )),
+                out_of_stock_items=Count('id', filter=Q(current_stock__lte=0)),
                 total_value=Sum(F('current_stock') * F('product__cost_price'))
-            )['total_value'] or 0
+            )
+            low_stock_items = stock_totals['low_stock_items']
+            out_of_stock_items = stock_totals['out_of_stock_items']
+            inventory_value = stock_totals['total_value'] or 0
             
             # Calculate percentages
             low_stock_percentage = round((low_stock_items / total_items * 100) if total_items > 0 else 0, 1)
@@ -376,6 +392,7 @@ class InventoryTransactionViewSet(viewsets.ModelViewSet):
     }
     search_fields = ['reference', 'notes', 'product__name', 'product__SKU']
     ordering_fields = ['created_at', 'quantity']
+    pagination_class = InventoryCursorPagination
 
     def get_queryset(self):
         queryset = InventoryTransaction.objects.select_related(
@@ -464,6 +481,15 @@ class BatchStockViewSet(viewsets.ModelViewSet):
     }
     search_fields = ['batch__batch_number', 'batch__product__name', 'batch__product__SKU']
     ordering_fields = ['batch__expiry_date', 'quantity', 'last_checked']
+    # Set by the expiring_soon/low_stock/expired actions
+    _preset_expiry_status = None
+    _preset_low_stock = False
+    
+    def dispatch(self, request, *args, **kwargs):
+        # Resolve the expiry window once per request
+        self._today = timezone.now().date()
+        self._expiry_threshold = self._today + timedelta(days=30)  # Next 30 days
+        return super().dispatch(request, *args, **kwargs)
     
     def get_queryset(self):
         """
@@ -473,21 +499,25 @@ class BatchStockViewSet(viewsets.ModelViewSet):
         
         # Filter by low stock - remove reference to non-existent reorder_level
         low_stock = self.request.query_params.get('low_stock', '').lower()
-        if low_stock in ['true', '1', 'yes']:
+        if self._preset_low_stock or low_stock in ['true', '1', 'yes']:
             queryset = queryset.filter(quantity__lte=0)  # Consider 0 as low stock
         
         # Filter by expiry status
-        expiry_status = self.request.query_params.get('expiry_status')
-        today = timezone.now().date()
+        expiry_status = self._preset_expiry_status or self.request.query_params.get('expiry_status')
         
         if expiry_status == 'expired':
-            queryset = queryset.filter(batch__expiry_date__lt=today)
+            queryset = queryset.filter(batch__expiry_date__lt=self._today)
         elif expiry_status == 'expiring_soon':
-            threshold = today + timedelta(days=30)  # Next 30 days
             queryset = queryset.filter(
-                batch__expiry_date__gte=today,
-                batch__expiry_date__lte=threshold
+                batch__expiry_date__gte=self._today,
+                batch__expiry_date__lte=self._expiry_threshold
             )
+        
+        # Default ordering for the preset actions; ?ordering= still overrides it
+        if self.action in ('expiring_soon', 'expired'):
+            queryset = queryset.order_by('batch__expiry_date', 'pk')
+        elif self.action == 'low_stock':
+            queryset = queryset.order_by('quantity', 'pk')
             
         return queryset
     
@@ -496,62 +526,32 @@ class BatchStockViewSet(viewsets.ModelViewSet):
             return serializers.BranchStockUpdateSerializer
         return self.serializer_class
     
+    def _filtered_list(self, request, expiry_status=None, low_stock=False):
+        """Run the regular list() with a preset filter kept on the view, not the query string."""
+        self._preset_expiry_status = expiry_status
+        self._preset_low_stock = low_stock
+        return self.list(request)
+    
     @action(detail=False, methods=['get'])
     def expiring_soon(self, request):
         """
         Get batches that are expiring soon (within the next 30 days).
         """
-        today = timezone.now().date()
-        threshold = today + timedelta(days=30)
-        
-        queryset = self.get_queryset().filter(
-            batch__expiry_date__isnull=False,
-            batch__expiry_date__gte=today,
-            batch__expiry_date__lte=threshold
-        ).order_by('batch__expiry_date')
-        
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-            
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self._filtered_list(request, expiry_status='expiring_soon')
     
     @action(detail=False, methods=['get'])
     def low_stock(self, request):
         """
         Get batches that are below their reorder level.
         """
-        queryset = self.get_queryset().filter(
-            quantity__lte=0  # Consider 0 as low stock
-        ).order_by('quantity')
-        
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-            
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self._filtered_list(request, low_stock=True)
     
     @action(detail=False, methods=['get'])
     def expired(self, request):
         """
         Get batches that have expired.
         """
-        today = timezone.now().date()
-        queryset = self.get_queryset().filter(
-            batch__expiry_date__lt=today
-        ).order_by('batch__expiry_date')
-        
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-            
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self._filtered_list(request, expiry_status='expired')
 
 class InventoryAdjustmentViewSet(viewsets.ModelViewSet):
     """
@@ -560,15 +560,7 @@ class InventoryAdjustmentViewSet(viewsets.ModelViewSet):
     serializer_class = InventoryAdjustmentSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = {
-        'product': ['exact'],
-        'branch': ['exact'],
-        'branch_stock': ['exact'],
-        'status': ['exact'],
-        'requested_by': ['exact'],
-        'reviewed_by': ['exact', 'isnull'],
-        'created_at': ['date__gte', 'date__lte', 'date__range'],
-    }
+    filterset_class = InventoryAdjustmentFilter
     search_fields = ['reason', 'review_notes', 'product__name', 'product__SKU']
     ordering_fields = ['created_at', 'reviewed_at', 'status']
 
@@ -635,6 +627,59 @@ class InventoryAdjustmentViewSet(viewsets.ModelViewSet):
             status=status.HTTP_200_OK
         )
     
+    @action(detail=False, methods=['post'])
+    def bulk_approve(self, request):
+        """
+        Approve several pending inventory adjustments in one request.
+        """
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            return Response(
+                {'detail': 'ids must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        now = timezone.now()
+        with transaction.atomic():
+            adjustments = list(
+                self.get_queryset().filter(id__in=ids, status='pending').select_for_update(of=('self',))
+            )
+            
+            branch_stocks = []
+            transactions = []
+            for adjustment in adjustments:
+                adjustment.status = 'approved'
+                adjustment.reviewed_by = request.user
+                adjustment.reviewed_at = now
+                adjustment.updated_at = now
+                
+                if adjustment.branch_stock:
+                    adjustment.branch_stock.current_stock = adjustment.quantity_after
+                    adjustment.branch_stock.updated_at = now
+                    branch_stocks.append(adjustment.branch_stock)
+                
+                transactions.append(InventoryTransaction(
+                    product=adjustment.product,
+                    branch=adjustment.branch,
+                    branch_stock=adjustment.branch_stock,
+                    transaction_type='adjustment',
+                    quantity=adjustment.quantity_after - adjustment.quantity_before,
+                    reference=f"Adjustment #{adjustment.id}",
+                    notes=adjustment.reason,
+                    created_by=adjustment.requested_by
+                ))
+            
+            InventoryAdjustment.objects.bulk_update(
+                adjustments, ['status', 'reviewed_by', 'reviewed_at', 'updated_at'], batch_size=500
+            )
+            BranchStock.objects.bulk_update(branch_stocks, ['current_stock', 'updated_at'], batch_size=500)
+            InventoryTransaction.objects.bulk_create(transactions, batch_size=500)
+        
+        return Response(
+            self.get_serializer(adjustments, many=True).data,
+            status=status.HTTP_200_OK
+        )
+    
     @action(detail=True, methods=['post'])
     def reject(self, request, pk=None):
         """
@@ -659,6 +704,17 @@ class InventoryAdjustmentViewSet(viewsets.ModelViewSet):
             status=status.HTTP_200_OK
         )
 
+@lru_cache(maxsize=None)
+def _menu_content_type_ids():
+    """Content type ids for Menu and MenuItem, resolved once per process."""
+    content_types = ContentType.objects.get_for_models(Menu, MenuItem)
+    return content_types[Menu].id, content_types[MenuItem].id
+
+def _popular_menu_items_cache_key(branch_id):
+    # Completed orders bump the version, which orphans every branch's cached list at once
+    version = cache.get_or_set(POPULAR_MENU_ITEMS_VERSION_KEY, 1, None)
+    return f'popular_menu_items:{branch_id}:v{version}'
+
 class MenuViewSet(viewsets.ModelViewSet):
     """ViewSet for managing menus."""
     queryset = Menu.objects.select_related('branch', 'created_by')
@@ -693,7 +749,7 @@ class MenuViewSet(viewsets.ModelViewSet):
         """Get all items in this menu."""
         menu = self.get_object()
         items = menu.items.filter(is_active=True).order_by('display_order', 'name')
-        serializer = MenuItemSerializer(items, many=True, context={'request': request})
+        serializer = MenuItemSerializer(items, many=True, context=self.get_serializer_context())
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
@@ -705,30 +761,31 @@ class MenuViewSet(viewsets.ModelViewSet):
         if branch_id:
             queryset = queryset.filter(branch_id=branch_id)
         
-        # Calculate stats
-        total_items = MenuItem.objects.filter(menu__in=queryset).count()
-        categories = Category.objects.filter(
-            menu_items__menu__in=queryset,
-            is_menu_category=True
-        ).distinct().count()
+        # Item, category and available-item counts in one aggregate query
+        item_totals = MenuItem.objects.filter(menu__in=queryset).aggregate(
+            total_items=Count('id'),
+            categories=Count('category', distinct=True, filter=Q(category__is_menu_category=True)),
+            available_items=Count('id', filter=Q(is_available=True))
+        )
+        total_items = item_totals['total_items']
+        categories = item_totals['categories']
         
         # Calculate items change (mock data for now)
         items_change = 2.5  # This would be calculated from historical data
         
-        # Get best sellers (items with most orders)
+        # Get best sellers (top 5 menu items by orders). Counting the distinct
+        # sold items gives the same number without grouping, ordering and
+        # limiting inside a COUNT subquery.
         from apps.sales.models import OrderItem
-        best_sellers = OrderItem.objects.filter(
+        sold_items = OrderItem.objects.filter(
             item_type='menu_item',
-            order__status='completed'
-        ).values('menu_item').annotate(
-            sales_count=Count('id')
-        ).order_by('-sales_count')[:5].count()
+            order__status='completed',
+            menu_item__isnull=False
+        ).values('menu_item').distinct().count()
+        best_sellers = min(sold_items, 5)
         
         # Get low stock items
-        low_stock_items = MenuItem.objects.filter(
-            menu__in=queryset,
-            is_available=True
-        ).count()  # This would check actual stock levels
+        low_stock_items = item_totals['available_items']  # This would check actual stock levels
         
         low_stock_percentage = round((low_stock_items / total_items * 100) if total_items > 0 else 0, 1)
         
@@ -753,65 +810,73 @@ class MenuViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(branch_id=branch_id)
         
         # Get recent menu and menu item changes
-        from django.contrib.contenttypes.models import ContentType
         from django.contrib.admin.models import LogEntry
         
-        menu_ct = ContentType.objects.get_for_model(Menu)
-        menu_item_ct = ContentType.objects.get_for_model(MenuItem)
+        menu_ct_id, menu_item_ct_id = _menu_content_type_ids()
         
         # Get recent log entries for menus and menu items
         log_entries = LogEntry.objects.filter(
-            content_type__in=[menu_ct, menu_item_ct],
+            content_type_id__in=[menu_ct_id, menu_item_ct_id],
             action_time__gte=timezone.now() - timezone.timedelta(days=7)
-        ).select_related('user', 'content_type').order_by('-action_time')[:10]
+        ).annotate(
+            user_full_name=Trim(Concat('user__first_name', Value(' '), 'user__last_name'))
+        ).only(
+            'id', 'action_time', 'action_flag', 'object_id', 'content_type'
+        ).order_by('-action_time')[:10]
+        
+        # Resolve the referenced menus and menu items in one query per type
+        menu_ids = [int(e.object_id) for e in log_entries if e.content_type_id == menu_ct_id]
+        menu_item_ids = [int(e.object_id) for e in log_entries if e.content_type_id == menu_item_ct_id]
+        menus = Menu.objects.in_bulk(menu_ids)
+        menu_items = MenuItem.objects.in_bulk(menu_item_ids)
         
         activities = []
         for entry in log_entries:
-            if entry.content_type == menu_ct:
-                try:
-                    menu = Menu.objects.get(id=entry.object_id)
-                    activities.append({
-                        'id': entry.id,
-                        'type': 'update' if entry.action_flag == 2 else 'create' if entry.action_flag == 1 else 'delete',
-                        'title': f"Menu {entry.get_action_flag_display().title()}",
-                        'description': f"{entry.get_action_flag_display().title()} menu '{menu.name}'",
-                        'timestamp': entry.action_time,
-                        'user': entry.user.get_full_name() if entry.user else 'System'
-                    })
-                except Menu.DoesNotExist:
+            if entry.content_type_id == menu_ct_id:
+                menu = menus.get(int(entry.object_id))
+                if menu is None:
                     continue
-            elif entry.content_type == menu_item_ct:
-                try:
-                    menu_item = MenuItem.objects.get(id=entry.object_id)
-                    activities.append({
-                        'id': entry.id,
-                        'type': 'update' if entry.action_flag == 2 else 'create' if entry.action_flag == 1 else 'delete',
-                        'title': f"Menu Item {entry.get_action_flag_display().title()}",
-                        'description': f"{entry.get_action_flag_display().title()} '{menu_item.name}'",
-                        'timestamp': entry.action_time,
-                        'user': entry.user.get_full_name() if entry.user else 'System'
-                    })
-                except MenuItem.DoesNotExist:
+                activities.append({
+                    'id': entry.id,
+                    'type': 'update' if entry.action_flag == 2 else 'create' if entry.action_flag == 1 else 'delete',
+                    'title': f"Menu {entry.get_action_flag_display().title()}",
+                    'description': f"{entry.get_action_flag_display().title()} menu '{menu.name}'",
+                    'timestamp': entry.action_time,
+                    'user': entry.user_full_name or 'System'
+                })
+            elif entry.content_type_id == menu_item_ct_id:
+                menu_item = menu_items.get(int(entry.object_id))
+                if menu_item is None:
                     continue
+                activities.append({
+                    'id': entry.id,
+                    'type': 'update' if entry.action_flag == 2 else 'create' if entry.action_flag == 1 else 'delete',
+                    'title': f"Menu Item {entry.get_action_flag_display().title()}",
+                    'description': f"{entry.get_action_flag_display().title()} '{menu_item.name}'",
+                    'timestamp': entry.action_time,
+                    'user': entry.user_full_name or 'System'
+                })
         
         return Response(activities)
 
 class MenuItemViewSet(viewsets.ModelViewSet):
     """ViewSet for managing menu items."""
-    queryset = MenuItem.objects.select_related('menu', 'category', 'created_by')
+    queryset = MenuItem.objects.select_related(
+        'menu__branch', 'category', 'created_by', 'recipe'
+    ).prefetch_related(
+        'allergens',
+        Prefetch('recipe__ingredients', queryset=RecipeIngredient.objects.select_related('ingredient', 'unit_of_measure'))
+    )
     serializer_class = MenuItemSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['menu', 'category', 'is_available', 'is_featured']
+    filterset_class = MenuItemFilter
     search_fields = ['name', 'description']
     ordering_fields = ['name', 'selling_price', 'display_order', 'created_at']
     
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        menu_id = self.request.query_params.get('menu_id')
-        if menu_id:
-            queryset = queryset.filter(menu_id=menu_id)
-        return queryset.filter(is_available=True)
+    def filter_queryset(self, queryset):
+        # Only available items are exposed; menu/menu_id filtering runs in the filterset
+        return super().filter_queryset(queryset).filter(is_available=True)
     
     def get_serializer_class(self):
         """Use MenuItemCreateSerializer for creation."""
@@ -880,10 +945,13 @@ class MenuItemViewSet(viewsets.ModelViewSet):
             from apps.branches.models import Branch
             try:
                 branch = Branch.objects.get(id=branch_id)
-                unavailable = menu_item.check_ingredient_availability(branch)
+                # SELECT 1 ... LIMIT 1; the detailed list is only built when something is missing
+                available = not menu_item.unavailable_ingredients(branch).exists()
+                if request.query_params.get('only') == 'available':
+                    return Response({'available': available})
                 return Response({
-                    'available': len(unavailable) == 0,
-                    'unavailable_ingredients': unavailable
+                    'available': available,
+                    'unavailable_ingredients': [] if available else menu_item.check_ingredient_availability(branch)
                 })
             except Branch.DoesNotExist:
                 return Response({'error': 'Branch not found'}, status=400)
@@ -892,36 +960,36 @@ class MenuItemViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def popular(self, request):
         """Get popular menu items based on sales."""
-        from apps.sales.models import OrderItem
-        
-        # Get popular items based on order count
-        popular_items = OrderItem.objects.filter(
-            item_type='menu_item',
-            order__status='completed'
-        ).values('menu_item').annotate(
-            sales_count=Count('id')
-        ).order_by('-sales_count')[:10]
-        
-        # Get the actual menu items
-        menu_item_ids = [item['menu_item'] for item in popular_items]
-        menu_items = MenuItem.objects.filter(id__in=menu_item_ids)
-        
-        # Create a mapping of sales count
-        sales_count_map = {item['menu_item']: item['sales_count'] for item in popular_items}
-        
-        # Serialize with sales count
-        serializer = self.get_serializer(menu_items, many=True)
-        data = serializer.data
-        
-        # Add sales count to each item
-        for item in data:
-            item['sales_count'] = sales_count_map.get(item['id'], 0)
-        
+        branch_id = get_request_branch_id(request)
+        cache_key = _popular_menu_items_cache_key(branch_id)
+        data = cache.get(cache_key)
+        if data is None:
+            data = self._compute_popular(branch_id)
+            cache.set(cache_key, data, POPULAR_MENU_ITEMS_CACHE_TIMEOUT)
         return Response(data)
 
+    def _compute_popular(self, branch_id=None):
+        """Rank menu items by completed sales and return the serialized top ten."""
+        # Count completed sales per menu item and rank them in a single query,
+        # limited to the requesting branch's orders so it matches the cache key
+        sales_filter = Q(order_items__item_type='menu_item', order_items__order__status='completed')
+        if branch_id:
+            sales_filter &= Q(order_items__order__branch_id=branch_id)
+        # The serializer never touches created_by or the soft-delete columns
+        popular_items = self.queryset.select_related(None).select_related(
+            'menu__branch', 'category', 'recipe'
+        ).defer('created_by', 'track_inventory', 'deleted_at', 'deleted_by').annotate(
+            sales_count=Count('order_items', filter=sales_filter)
+        ).filter(sales_count__gt=0).order_by('-sales_count', 'pk')[:10]
+        
+        serializer = PopularMenuItemSerializer(popular_items, many=True, context=self.get_serializer_context())
+        return list(serializer.data)
+
 class RecipeViewSet(viewsets.ModelViewSet):
     """ViewSet for managing recipes."""
-    queryset = Recipe.objects.select_related('menu_item', 'created_by')
+    queryset = Recipe.objects.select_related('menu_item', 'created_by').prefetch_related(
+        Prefetch('ingredients', queryset=RecipeIngredient.objects.select_related('ingredient', 'unit_of_measure'))
+    )
     serializer_class = RecipeSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -968,12 +1036,28 @@ class CatalogView(APIView):
         is_available = request.query_params.get('is_available')
         search = request.query_params.get('search')
 
+        # Per-row stock comes from the branch_id query param, as the catalog serializers always did
+        try:
+            stock_branch_id = int(request.query_params['branch_id'])
+        except (KeyError, ValueError):
+            stock_branch_id = None
+
+        def stock_for(**match):
+            if stock_branch_id is None:
+                return Value(None, output_field=DecimalField())
+            return Subquery(
+                BranchStock.objects.filter(branch_id=stock_branch_id, **match)
+                .order_by('pk').values('current_stock')[:1]
+            )
+
+        # Products and menu items are projected to the same columns and
+        # combined with UNION ALL, so sorting and LIMIT/OFFSET happen in SQL
         # --- PRODUCTS ---
         products_qs = Product.objects.filter(
             branch_stock__branch_id=branch_id,
             branch_stock__is_active=True,
             is_active=True
-        ).select_related('category', 'unit_of_measure').prefetch_related('images')
+        )
         # Filtering
         if category_filter:
             products_qs = products_qs.filter(category__name=category_filter)
@@ -986,11 +1070,21 @@ class CatalogView(APIView):
             products_qs = products_qs.filter(
                 Q(name__icontains=search) | Q(description__icontains=search)
             )
+        products_qs = products_qs.order_by().annotate(
+            category_name=F('category__name'),
+            item_kind=Value('product', output_field=CharField()),
+            available=F('is_available_for_sale'),
+            stock=stock_for(product=OuterRef('pk')),
+            image_path=Subquery(
+                ProductImage.objects.filter(product=OuterRef('pk'), is_default=True, is_active=True)
+                .order_by('pk').values('image')[:1]
+            ),
+        ).values(*CATALOG_ROW_FIELDS)
         # --- MENU ITEMS ---
         menu_items_qs = MenuItem.objects.filter(
             menu__branch_id=branch_id,
             is_available=True
-        ).select_related('category', 'menu', 'created_by')
+        )
         if category_filter:
             menu_items_qs = menu_items_qs.filter(category__name=category_filter)
         if is_available is not None:
@@ -1002,23 +1096,23 @@ class CatalogView(APIView):
             menu_items_qs = menu_items_qs.filter(
                 Q(name__icontains=search) | Q(description__icontains=search)
             )
-        # Serialize
-        products_data = MinimalCatalogProductSerializer(products_qs, many=True, context={'request': request}).data
-        menu_items_data = MinimalCatalogMenuItemSerializer(menu_items_qs, many=True, context={'request': request}).data
-        # Combine and group by category
-        all_items = products_data + menu_items_data
-        # Group by category_name
-        grouped = {}
-        for item in all_items:
-            cat = item.get('category_name') or 'Uncategorized'
-            grouped.setdefault(cat, []).append(item)
-        # Pagination (flatten, then slice, then regroup)
-        flat_items = [item for sublist in grouped.values() for item in sublist]
-        total_count = len(flat_items)
+        menu_items_qs = menu_items_qs.order_by().annotate(
+            category_name=F('category__name'),
+            item_kind=Value('menu_item', output_field=CharField()),
+            available=F('is_available'),
+            stock=stock_for(menu_item=OuterRef('pk')),
+            image_path=Value(None, output_field=CharField()),
+        ).values(*CATALOG_ROW_FIELDS)
+
+        # Menu items get a same-named product of the same category, so the
+        # kind and id tie-breakers keep twins in a fixed order across pages
+        catalog_qs = products_qs.union(menu_items_qs, all=True).order_by('category_name', 'name', 'item_kind', 'id')
+        total_count = catalog_qs.count()
         start = (page - 1) * page_size
-        end = start + page_size
-        paginated_items = flat_items[start:end]
-        # Regroup paginated items
+        paginated_items = CatalogRowSerializer(
+            catalog_qs[start:start + page_size], many=True, context={'request': request}
+        ).data
+        # Group the page by category
         paginated_grouped = {}
         for item in paginated_items:
             cat = item.get('category_name') or 'Uncategorized'
@@ -1032,7 +1126,7 @@ class CatalogView(APIView):
 
 class ModifierViewSet(viewsets.ModelViewSet):
     """ViewSet for managing menu modifiers."""
-    queryset = Modifier.objects.select_related('branch', 'created_by').prefetch_related('options', 'menu_items')
+    queryset = Modifier.objects.select_related('branch', 'created_by').prefetch_related('options__allergens', 'menu_items')
     serializer_class = ModifierSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -1079,7 +1173,11 @@ class MenuItemModifierViewSet(viewsets.ModelViewSet):
 
 class StockCountViewSet(viewsets.ModelViewSet):
     """API endpoint for managing stock counts."""
-    queryset = StockCount.objects.select_related('product', 'branch', 'user')
+    queryset = StockCount.objects.select_related('product', 'branch', 'user').only(
+        'id', 'product_id', 'branch_id', 'user_id', 'counted_quantity', 'date', 'notes',
+        'created_at', 'updated_at', 'product__name', 'branch__name',
+        'user__first_name', 'user__last_name'
+    )
     serializer_class = StockCountSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
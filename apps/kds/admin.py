@@ -1,12 +1,32 @@
+from functools import lru_cache
+
 from django.contrib import admin
+from django.db.models import Case, CharField, Count, F, Value, When
+from django.db.models.functions import Cast, Concat
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from django.utils.html import format_html
+from django.utils.html import escape
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 
 from .models import KDSStation, KDSItem
 from apps.branches.models import Branch
 
+# Choice labels resolved once instead of per row through get_FOO_display()
+STATION_TYPE_LABELS = dict(KDSStation.StationType.choices)
+STATUS_LABELS = dict(KDSItem.Status.choices)
+
+
+@lru_cache(maxsize=None)
+def _change_url_template(viewname):
+    """Reverse an admin change URL once and return it as a str.format template."""
+    return reverse(viewname, args=[0]).replace('/0/', '/{}/')
+
+
+def _change_link(viewname, pk, text):
+    url = _change_url_template(viewname).format(pk)
+    return mark_safe(f'<a href="{url}">{escape(text)}</a>')
+
 
 class KDSItemInline(admin.TabularInline):
     """Inline for KDS items in station admin."""
@@ -16,6 +36,12 @@ class KDSItemInline(admin.TabularInline):
     readonly_fields = ('order_item', 'created_at', 'time_since_created')
     show_change_link = True
 
+    def get_queryset(self, request):
+        # Only open tickets; completed/cancelled history would make the inline unbounded
+        return super().get_queryset(request).filter(
+            status__in=[KDSItem.Status.PENDING, KDSItem.Status.IN_PROGRESS]
+        ).select_related('order_item__product', 'order_item__menu_item', 'order_item__order')
+
     def time_since_created(self, obj):
         if not obj.created_at:
             return '-' 
@@ -31,6 +57,7 @@ class KDSStationAdmin(admin.ModelAdmin):
     search_fields = ('name', 'description', 'branch__name')
     list_editable = ('is_active',)
     list_select_related = ('branch',)
+    list_per_page = 50
     inlines = [KDSItemInline]
     fieldsets = (
         (None, {
@@ -42,16 +69,19 @@ class KDSStationAdmin(admin.ModelAdmin):
     )
 
     def station_type_display(self, obj):
-        return obj.get_station_type_display()
+        return STATION_TYPE_LABELS.get(obj.station_type, obj.station_type)
     station_type_display.short_description = _('Station Type')
     station_type_display.admin_order_field = 'station_type'
 
     def items_count(self, obj):
-        return obj.kds_items.count()
+        return obj._items_count
     items_count.short_description = _('Items Count')
+    items_count.admin_order_field = '_items_count'
 
     def get_queryset(self, request):
-        return super().get_queryset(request).prefetch_related('kds_items')
+        return super().get_queryset(request).select_related('branch').annotate(
+            _items_count=Count('kds_items')
+        )
 
 
 class StatusFilter(admin.SimpleListFilter):
@@ -60,7 +90,7 @@ class StatusFilter(admin.SimpleListFilter):
     parameter_name = 'status'
 
     def lookups(self, request, model_admin):
-        return KDSItem.STATUS_CHOICES
+        return KDSItem.Status.choices
 
     def queryset(self, request, queryset):
         if self.value():
@@ -82,6 +112,7 @@ class KDSItemAdmin(admin.ModelAdmin):
         'order_item__order__order_number'
     )
     list_select_related = ('station', 'order_item', 'order_item__order')
+    show_full_result_count = False
     readonly_fields = (
         'created_at', 'updated_at', 'completed_at',
         'time_since_created', 'time_in_status', 'order_item_link'
@@ -104,21 +135,22 @@ class KDSItemAdmin(admin.ModelAdmin):
     def order_item_link(self, obj):
         if not obj.order_item:
             return '-'
-        url = reverse('admin:sales_orderitem_change', args=[obj.order_item.id])
-        return format_html('<a href="{}">{}</a>', url, str(obj.order_item))
+        return _change_link(
+            'admin:sales_orderitem_change', obj.order_item_id,
+            getattr(obj, '_order_item_str', None) or str(obj.order_item)
+        )
     order_item_link.short_description = _('Order Item')
     order_item_link.admin_order_field = 'order_item'
 
     def station_link(self, obj):
         if not obj.station:
             return '-'
-        url = reverse('admin:kds_kdsstation_change', args=[obj.station.id])
-        return format_html('<a href="{}">{}</a>', url, str(obj.station))
+        return _change_link('admin:kds_kdsstation_change', obj.station_id, str(obj.station))
     station_link.short_description = _('Station')
     station_link.admin_order_field = 'station__name'
 
     def status_display(self, obj):
-        return obj.get_status_display()
+        return STATUS_LABELS.get(obj.status, obj.status)
     status_display.short_description = _('Status')
     status_display.admin_order_field = 'status'
 
@@ -131,32 +163,43 @@ class KDSItemAdmin(admin.ModelAdmin):
     time_in_status.short_description = _('Time in status')
 
     def mark_in_progress(self, request, queryset):
-        updated = 0
-        for item in queryset:
-            item.mark_in_progress()
-            updated += 1
+        updated = queryset.update(status='in_progress', updated_at=timezone.now())
         self.message_user(request, f"Marked {updated} items as in progress.")
     mark_in_progress.short_description = _("Mark selected items as in progress")
 
     def mark_completed(self, request, queryset):
-        updated = 0
-        for item in queryset:
-            item.mark_completed()
-            updated += 1
+        now = timezone.now()
+        updated = queryset.update(status='completed', completed_at=now, updated_at=now)
         self.message_user(request, f"Marked {updated} items as completed.")
     mark_completed.short_description = _("Mark selected items as completed")
 
     def mark_cancelled(self, request, queryset):
-        updated = 0
-        for item in queryset:
-            item.mark_cancelled()
-            updated += 1
+        updated = queryset.update(status='cancelled', updated_at=timezone.now())
         self.message_user(request, f"Marked {updated} items as cancelled.")
     mark_cancelled.short_description = _("Mark selected items as cancelled")
 
     def get_queryset(self, request):
+        # Mirrors OrderItem.__str__ in SQL so the changelist doesn't format it per row
         return super().get_queryset(request).select_related(
             'station',
             'order_item__product',
             'order_item__order'
+        ).annotate(
+            _order_item_str=Concat(
+                # Mirrors OrderItem.get_item_name(): the name follows item_type
+                Case(
+                    When(order_item__item_type='product', order_item__product__isnull=False,
+                         then=F('order_item__product__name')),
+                    When(order_item__item_type='menu_item', order_item__menu_item__isnull=False,
+                         then=F('order_item__menu_item__name')),
+                    default=Value('Unknown Item'),
+                    output_field=CharField()
+                ),
+                Value(' x '),
+                Cast('order_item__quantity', CharField()),
+                Value(' ('),
+                'order_item__order__order_number',
+                Value(')'),
+                output_field=CharField()
+            )
         )
@@ -1,7 +1,9 @@
 import random
 from django.core.management.base import BaseCommand
 from faker import Faker
-from apps.kds.models import KDSStation, KDSItem
+from django.db import transaction
+from django.db.models.signals import post_save
+from apps.kds.models import KDSStation, KDSItem, create_kds_item, clear_branch_station_ids
 from apps.branches.models import Branch
 from apps.sales.models import Order, OrderItem
 from apps.inventory.models import Product
@@ -26,21 +28,29 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR('No branch found. Please seed branches first.'))
             return
 
-        # Create KDS stations
-        station_types = ['hot_kitchen', 'cold_kitchen', 'prep', 'beverage']
-        stations = []
-        for i in range(station_count):
-            station, _ = KDSStation.objects.get_or_create(
+        # Create KDS stations in one INSERT; (branch, name) is unique, so
+        # stations from an earlier run are skipped by the database
+        station_types = KDSStation.StationType.values
+        station_names = [f"KDS Station {i+1}" for i in range(station_count)]
+        KDSStation.objects.bulk_create([
+            KDSStation(
                 branch=branch,
-                name=f"KDS Station {i+1}",
-                defaults={
-                    'station_type': random.choice(station_types),
-                    'description': fake.sentence(),
-                    'is_active': True,
-                    'metadata': {'screen_size': random.choice(['15\"', '21\"', '27\"'])}
-                }
+                name=name,
+                station_type=random.choice(station_types),
+                description=fake.sentence(),
+                is_active=True,
+                metadata={'screen_size': random.choice(['15\"', '21\"', '27\"'])}
             )
-            stations.append(station)
+            for name in station_names
+        ], ignore_conflicts=True)
+        # bulk_create bypasses post_save, so drop the cached station ids by hand
+        clear_branch_station_ids(branch.id)
+        stations_by_name = {
+            station.name: station
+            for station in KDSStation.objects.filter(branch=branch, name__in=station_names)
+        }
+        stations = [stations_by_name[name] for name in station_names]
+        for station in stations:
             self.stdout.write(self.style.SUCCESS(f'Created station: {station.name}'))
 
         # Get or create a user for created_by
@@ -52,38 +62,73 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR('No product found. Please seed products first.'))
             return
 
-        # Create KDS items (and OrderItems) for each station
-        for station in stations:
-            for j in range(items_per_station):
-                # Create a fake order
-                order, _ = Order.objects.get_or_create(
+        # Stations the create_kds_item signal would pick for each station type
+        stations_by_type = {}
+        for station in KDSStation.objects.filter(branch=branch):
+            stations_by_type.setdefault(station.station_type, station)
+        kds_station = stations_by_type.get(product.get_kds_station_type())
+
+        # One demo order per status, shared by all seeded items. Missing ones
+        # are bulk-inserted; bulk_create skips Order.save(), so number them here
+        demo_statuses = [Order.Status.CONFIRMED, Order.Status.PROCESSING, Order.Status.READY]
+        demo_orders = Order.objects.filter(
+            branch=branch, order_type=Order.OrderType.DINE_IN, status__in=demo_statuses
+        ).order_by('pk')
+        orders_by_status = {}
+        for order in demo_orders:
+            orders_by_status.setdefault(order.status, order)
+        missing_statuses = [s for s in demo_statuses if s not in orders_by_status]
+        if missing_statuses:
+            prefix, last_seq = Order(branch=branch).generate_order_number().rsplit('-', 1)
+            Order.objects.bulk_create([
+                Order(
                     branch=branch,
-                    status=random.choice([
-                        Order.Status.CONFIRMED,
-                        Order.Status.PROCESSING,
-                        Order.Status.READY
-                    ]),
+                    status=order_status,
                     order_type=Order.OrderType.DINE_IN,
-                    defaults={
-                        'service_type': Order.ServiceType.REGULAR,
-                        'notes': fake.sentence(),
-                    }
-                )
-                # Create a fake order item (signal will create KDSItem)
-                order_item = OrderItem.objects.create(
-                    order=order,
-                    product=product,
-                    item_type=OrderItem.ItemType.PRODUCT,
-                    quantity=random.randint(1, 5),
-                    unit_price=product.selling_price,
-                    status=OrderItem.Status.PREPARING,
-                    kitchen_status=OrderItem.Status.PREPARING,
+                    service_type=Order.ServiceType.REGULAR,
                     notes=fake.sentence(),
-                    kitchen_notes=fake.sentence(),
+                    order_number=f"{prefix}-{int(last_seq) + i:04d}"
                 )
-                self.stdout.write(self.style.SUCCESS(
-                    f'Created OrderItem: {order_item.id} (Order: {order.order_number})'
-                ))
+                for i, order_status in enumerate(missing_statuses)
+            ], ignore_conflicts=True)
+            for order in demo_orders.all():
+                orders_by_status.setdefault(order.status, order)
+        demo_orders = list(orders_by_status.values())
+
+        # Create the OrderItems and their KDSItems in bulk instead of one
+        # signal-driven insert per item
+        post_save.disconnect(create_kds_item, sender=OrderItem)
+        try:
+            with transaction.atomic():
+                for station in stations:
+                    order_items = []
+                    for j in range(items_per_station):
+                        order_item = OrderItem(
+                            order=random.choice(demo_orders),
+                            product=product,
+                            item_type=OrderItem.ItemType.PRODUCT,
+                            quantity=random.randint(1, 5),
+                            unit_price=product.selling_price,
+                            status=OrderItem.Status.PREPARING,
+                            kitchen_status=OrderItem.Status.PREPARING,
+                            notes=fake.sentence(),
+                            kitchen_notes=fake.sentence(),
+                        )
+                        # bulk_create skips save(), so fill in the totals here
+                        order_item._update_totals()
+                        order_items.append(order_item)
+
+                    OrderItem.objects.bulk_create(order_items, batch_size=500)
+                    if kds_station:
+                        KDSItem.objects.bulk_create(
+                            [KDSItem(station=kds_station, order_item=order_item) for order_item in order_items],
+                            batch_size=500
+                        )
+                    self.stdout.write(self.style.SUCCESS(
+                        f'Created {len(order_items)} OrderItems for {station.name}'
+                    ))
+        finally:
+            post_save.connect(create_kds_item, sender=OrderItem)
 
         self.stdout.write(self.style.SUCCESS(
             f'Successfully seeded {station_count} KDS stations and {station_count * items_per_station} KDS items.'
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kds', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='kdsstation',
+            name='metadata',
+            field=models.JSONField(blank=True, db_default=models.Value({}, output_field=models.JSONField()), default=dict, help_text='Additional station-specific data in JSON format', verbose_name='additional metadata'),
+        ),
+        migrations.AlterField(
+            model_name='kdsitem',
+            name='metadata',
+            field=models.JSONField(blank=True, db_default=models.Value({}, output_field=models.JSONField()), default=dict, help_text='Additional item-specific data in JSON format', verbose_name='additional metadata'),
+        ),
+    ]
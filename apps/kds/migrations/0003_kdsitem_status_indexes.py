@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kds', '0002_metadata_db_default'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='kdsitem',
+            index=models.Index(fields=['station', 'status', '-created_at'], name='kdsitem_stn_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='kdsitem',
+            index=models.Index(condition=models.Q(('status__in', ['completed', 'cancelled']), _negated=True), fields=['station', 'status'], name='kdsitem_active_partial'),
+        ),
+    ]
@@ -1,7 +1,8 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
-from django.db.models import JSONField
-from django.db.models.signals import post_save
+from django.db.models import JSONField, Q, Value
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
 
@@ -12,18 +13,19 @@ from apps.sales.models import Order, OrderItem
 
 class KDSStation(BaseNameDescriptionModel, TimestampedModel, SoftDeleteModel):
     """Represents a kitchen display station."""
+    class StationType(models.TextChoices):
+        HOT_KITCHEN = 'hot_kitchen', _('Hot Kitchen')
+        COLD_KITCHEN = 'cold_kitchen', _('Cold Kitchen')
+        PREP = 'prep', _('Prep Station')
+        BEVERAGE = 'beverage', _('Beverage Station')
+
     branch = models.ForeignKey(Branch,on_delete=models.CASCADE,related_name='kds_stations',verbose_name=_('branch'))
-    station_type = models.CharField(_('station type'),max_length=50,choices=[
-            ('hot_kitchen', _('Hot Kitchen')),
-            ('cold_kitchen', _('Cold Kitchen')),
-            ('prep', _('Prep Station')),
-            ('beverage', _('Beverage Station'))
-        ],
-        default='hot_kitchen',
+    station_type = models.CharField(_('station type'),max_length=50,choices=StationType.choices,
+        default=StationType.HOT_KITCHEN,
         help_text=_('Type of kitchen station')
     )
     is_active = models.BooleanField(_('is active'),default=True,help_text=_('Whether this station is currently active'))
-    metadata = JSONField(_('additional metadata'),default=dict,blank=True,help_text=_('Additional station-specific data in JSON format'))
+    metadata = JSONField(_('additional metadata'),default=dict,db_default=Value({}, output_field=JSONField()),blank=True,help_text=_('Additional station-specific data in JSON format'))
 
     class Meta:
         verbose_name = _('kds station')
@@ -50,20 +52,21 @@ class KDSStation(BaseNameDescriptionModel, TimestampedModel, SoftDeleteModel):
 
 class KDSItem(BaseNameDescriptionModel, TimestampedModel, SoftDeleteModel):
     """Represents an item on the kitchen display system."""
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('Pending')
+        IN_PROGRESS = 'in_progress', _('In Progress')
+        COMPLETED = 'completed', _('Completed')
+        CANCELLED = 'cancelled', _('Cancelled')
+
     station = models.ForeignKey(KDSStation,on_delete=models.CASCADE,related_name='kds_items',verbose_name=_('station'))
     order_item = models.OneToOneField(OrderItem,on_delete=models.CASCADE,related_name='kds_item',verbose_name=_('order item'))
-    status = models.CharField(_('status'),max_length=20,choices=[
-            ('pending', _('Pending')),
-            ('in_progress', _('In Progress')),
-            ('completed', _('Completed')),
-            ('cancelled', _('Cancelled'))
-        ],
-        default='pending',
+    status = models.CharField(_('status'),max_length=20,choices=Status.choices,
+        default=Status.PENDING,
         help_text=_('Current status of the kitchen item')
     )
     kitchen_notes = models.TextField(_('kitchen notes'),blank=True,help_text=_('Notes from kitchen staff about this item'))
     completed_at = models.DateTimeField(_('completed at'),null=True,blank=True,help_text=_('When the item was completed'))
-    metadata = JSONField(_('additional metadata'),default=dict,blank=True,help_text=_('Additional item-specific data in JSON format'))
+    metadata = JSONField(_('additional metadata'),default=dict,db_default=Value({}, output_field=JSONField()),blank=True,help_text=_('Additional item-specific data in JSON format'))
 
     class Meta:
         verbose_name = _('kds item')
@@ -72,7 +75,15 @@ class KDSItem(BaseNameDescriptionModel, TimestampedModel, SoftDeleteModel):
         indexes = [
             models.Index(fields=['station', 'status']),
             models.Index(fields=['created_at']),
-            models.Index(fields=['completed_at'])
+            models.Index(fields=['completed_at']),
+            # Station item lists filter on station + status, newest first
+            models.Index(fields=['station', 'status', '-created_at'], name='kdsitem_stn_status_created_idx'),
+            # Open tickets only; stays small however much history accumulates
+            models.Index(
+                fields=['station', 'status'],
+                condition=~Q(status__in=['completed', 'cancelled']),
+                name='kdsitem_active_partial'
+            ),
         ]
 
     def __str__(self):
@@ -115,6 +126,41 @@ class KDSItem(BaseNameDescriptionModel, TimestampedModel, SoftDeleteModel):
         self.save()
 
 
+STATION_ID_CACHE_TIMEOUT = 300
+
+
+def _station_cache_key(branch_id, station_type):
+    return f'kds_station_id:{branch_id}:{station_type}'
+
+
+def _station_id_for(branch_id, station_type):
+    """Resolve the station id for a branch/station type, cached in Django's cache."""
+    key = _station_cache_key(branch_id, station_type)
+    station_id = cache.get(key)
+    if station_id is None:
+        station_id = KDSStation.objects.filter(
+            branch_id=branch_id,
+            station_type=station_type
+        ).values_list('id', flat=True).first()
+        # Cache misses as 0 so branches without a matching station don't re-query
+        cache.set(key, station_id or 0, STATION_ID_CACHE_TIMEOUT)
+    return station_id or None
+
+
+def clear_branch_station_ids(branch_id):
+    """Drop every cached station id for a branch."""
+    cache.delete_many([
+        _station_cache_key(branch_id, station_type)
+        for station_type in KDSStation.StationType.values
+    ])
+
+
+@receiver([post_save, post_delete], sender=KDSStation)
+def clear_station_id_cache(sender, instance, **kwargs):
+    """Drop cached station ids for the branch whenever one of its stations changes."""
+    clear_branch_station_ids(instance.branch_id)
+
+
 @receiver(post_save, sender=OrderItem)
 def create_kds_item(sender, instance, created, **kwargs):
     """Create KDS item when order item is created."""
@@ -127,12 +173,14 @@ def create_kds_item(sender, instance, created, **kwargs):
             station_type = instance.menu_item.get_kds_station_type()
         # Only proceed if station_type is found
         if station_type:
-            station = KDSStation.objects.filter(
-                branch=instance.order.branch,
-                station_type=station_type
-            ).first()
-            if station:
+            # Reuse the cached order when the caller set one; otherwise read just its branch_id
+            if OrderItem.order.is_cached(instance):
+                branch_id = instance.order.branch_id
+            else:
+                branch_id = Order.objects.filter(pk=instance.order_id).values_list('branch_id', flat=True).first()
+            station_id = _station_id_for(branch_id, station_type)
+            if station_id:
                 KDSItem.objects.create(
-                    station=station,
+                    station_id=station_id,
                     order_item=instance
                 )
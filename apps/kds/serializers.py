@@ -1,15 +1,20 @@
+from copy import copy
+
 from rest_framework import serializers
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from .models import KDSStation, KDSItem
-from apps.sales.serializers import OrderItemSerializer
+from apps.base.serializers import CachedModelSerializer, ChoiceLabelField
+
+STATUS_CHOICES = tuple(KDSItem.Status.choices)
 
 
-class KDSStationSerializer(serializers.ModelSerializer):
+class KDSStationSerializer(CachedModelSerializer):
     """Serializer for KDSStation model."""
     branch_name = serializers.CharField(source='branch.name', read_only=True)
-    station_type_display = serializers.CharField(source='get_station_type_display', read_only=True)
-    active_orders_count = serializers.SerializerMethodField()
+    station_type_display = ChoiceLabelField(KDSStation.StationType.choices, source='station_type')
+    active_orders_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = KDSStation
@@ -24,18 +29,48 @@ class KDSStationSerializer(serializers.ModelSerializer):
             'station_type': {'required': True}
         }
 
-    def get_active_orders_count(self, obj):
-        return obj.active_orders.count()
-
 
-class KDSItemSerializer(serializers.ModelSerializer):
-    """Serializer for KDSItem model."""
+class KDSItemListSerializer(CachedModelSerializer):
+    """Compact KDSItem serializer for the list endpoints; no nested order item."""
     station_name = serializers.CharField(source='station.name', read_only=True)
-    order_item_details = OrderItemSerializer(source='order_item', read_only=True)
-    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    status_display = ChoiceLabelField(STATUS_CHOICES, source='status')
     time_since_created = serializers.SerializerMethodField()
     time_in_status = serializers.SerializerMethodField()
 
+    class Meta:
+        model = KDSItem
+        fields = [
+            'id', 'name', 'station', 'station_name', 'order_item',
+            'status', 'status_display', 'created_at', 'updated_at',
+            'time_since_created', 'time_in_status'
+        ]
+        read_only_fields = fields
+
+    def _now(self):
+        # Views pass one 'now' for the whole response; fall back for ad-hoc use
+        return self.context.get('now') or timezone.now()
+
+    # The KDS views annotate both durations in SQL; compute them here only for
+    # instances that didn't come from those querysets (e.g. after create)
+    def get_time_since_created(self, obj):
+        if hasattr(obj, '_minutes_since_created'):
+            return obj._minutes_since_created
+        if not obj.created_at:
+            return None
+        return (self._now() - obj.created_at).total_seconds() // 60  # minutes
+
+    def get_time_in_status(self, obj):
+        if hasattr(obj, '_minutes_in_status'):
+            return obj._minutes_in_status
+        if not obj.updated_at:
+            return None
+        return (self._now() - obj.updated_at).total_seconds() // 60  # minutes
+
+
+class KDSItemSerializer(KDSItemListSerializer):
+    """Serializer for KDSItem model."""
+    order_item_details = serializers.SerializerMethodField()
+
     class Meta:
         model = KDSItem
         fields = [
@@ -51,40 +86,67 @@ class KDSItemSerializer(serializers.ModelSerializer):
             'status': {'required': True}
         }
 
-    def get_time_since_created(self, obj):
-        from django.utils import timezone
-        if not obj.created_at:
-            return None
-        return (timezone.now() - obj.created_at).total_seconds() // 60  # minutes
-
-    def get_time_in_status(self, obj):
-        from django.utils import timezone
-        if not obj.updated_at:
-            return None
-        return (timezone.now() - obj.updated_at).total_seconds() // 60  # minutes
+    def get_order_item_details(self, obj):
+        # Built from the rows the view already joined/prefetched rather than a
+        # nested OrderItemSerializer; carries the kitchen-facing fields only
+        order_item = obj.order_item
+        product, menu_item = order_item.product, order_item.menu_item
+        source = product or menu_item
+        return {
+            'id': order_item.pk,
+            'item_type': order_item.item_type,
+            'product': order_item.product_id,
+            'product_name': product.name if product else None,
+            'menu_item': order_item.menu_item_id,
+            'menu_item_name': menu_item.name if menu_item else None,
+            'item_name': order_item.get_item_name(),
+            'item_description': order_item.get_item_description(),
+            'quantity': str(order_item.quantity),
+            'status': order_item.status,
+            'notes': order_item.notes,
+            'kitchen_notes': order_item.kitchen_notes,
+            'kitchen_status': order_item.kitchen_status,
+            'modifiers': order_item.modifiers,
+            'allergens': [allergen.name for allergen in source.allergens.all()] if source else [],
+            'created_at': order_item.created_at,
+        }
 
 
 class KDSItemStatusUpdateSerializer(serializers.Serializer):
     """Serializer for updating KDSItem status."""
     status = serializers.ChoiceField(
-        choices=KDSItem._meta.get_field('status').choices,
+        choices=STATUS_CHOICES,
         required=True
     )
     notes = serializers.CharField(required=False, allow_blank=True)
 
+    def get_fields(self):
+        # Declared fields carry no per-request state, so shallow copies are enough
+        # and share the ChoiceField's built choice maps instead of rebuilding them
+        return {name: copy(field) for name, field in self._declared_fields.items()}
+
+    # Columns each status transition writes; 'pending' is not a transition
+    STATUS_UPDATE_FIELDS = {
+        KDSItem.Status.IN_PROGRESS: ('status', 'updated_at'),
+        KDSItem.Status.COMPLETED: ('status', 'completed_at', 'updated_at'),
+        KDSItem.Status.CANCELLED: ('status', 'updated_at'),
+    }
+
     def update(self, instance, validated_data):
         status = validated_data.get('status')
         notes = validated_data.get('notes', '')
-        
-        if status == 'in_progress':
-            instance.mark_in_progress()
-        elif status == 'completed':
-            instance.mark_completed()
-        elif status == 'cancelled':
-            instance.mark_cancelled()
-        
+
+        update_fields = list(self.STATUS_UPDATE_FIELDS.get(status, ()))
+        if update_fields:
+            instance.status = status
+            if status == KDSItem.Status.COMPLETED:
+                instance.completed_at = timezone.now()
         if notes:
             instance.kitchen_notes = notes
-            instance.save()
-        
+            update_fields += ['kitchen_notes', 'updated_at']
+
+        # One UPDATE for the transition and the notes together
+        if update_fields:
+            instance.save(update_fields=set(update_fields))
+
         return instance
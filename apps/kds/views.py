@@ -4,21 +4,69 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
+from django.db.models import Count, DurationField, ExpressionWrapper, F, IntegerField, Q
+from django.db.models.functions import Cast, Extract, Floor, Now
+from django.utils import timezone
 
 from .models import KDSStation, KDSItem
 from .serializers import (
     KDSStationSerializer,
     KDSItemSerializer,
+    KDSItemListSerializer,
     KDSItemStatusUpdateSerializer
 )
 from apps.base.utils import get_request_branch_id
 
 
+def _minutes_since(field):
+    """Whole minutes between `field` and the database clock, computed in SQL."""
+    elapsed = ExpressionWrapper(Now() - F(field), output_field=DurationField())
+    return Cast(Floor(Extract(elapsed, 'epoch') / 60), IntegerField())
+
+
+def with_elapsed_minutes(queryset):
+    """Annotate the read-only list columns time_since_created/time_in_status."""
+    return queryset.annotate(
+        _minutes_since_created=_minutes_since('created_at'),
+        _minutes_in_status=_minutes_since('updated_at'),
+    )
+
+
+def with_list_columns(queryset):
+    """Load only what KDSItemListSerializer reads."""
+    return queryset.select_related('station').only(
+        'id', 'name', 'station', 'station__name', 'order_item',
+        'status', 'created_at', 'updated_at'
+    )
+
+
+def with_item_relations(queryset):
+    """Load everything KDSItemSerializer (including order_item_details) reads."""
+    return queryset.select_related(
+        'station',
+        'order_item__product',
+        'order_item__menu_item',
+    ).defer(
+        # Wide columns on the joined rows that no serializer field reads
+        'station__description',
+        'station__metadata',
+        'order_item__product__notes',
+        'order_item__product__nutritional_info',
+        'order_item__menu_item__nutritional_info',
+    ).prefetch_related(
+        'order_item__product__allergens',
+        'order_item__menu_item__allergens',
+    )
+
+
 class KDSStationViewSet(viewsets.ModelViewSet):
     """
     API endpoint for KDS Stations.
     """
-    queryset = KDSStation.objects.all()
+    queryset = KDSStation.objects.select_related('branch').only(
+        'id', 'name', 'description', 'branch', 'branch__name', 'station_type',
+        'is_active', 'metadata', 'created_at', 'updated_at'
+    )
     serializer_class = KDSStationSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
@@ -31,7 +79,21 @@ class KDSStationViewSet(viewsets.ModelViewSet):
         """
         Optionally filter by branch if provided in query params.
         """
-        queryset = super().get_queryset()
+        if self.action == 'items':
+            # Only resolves the station; its items are loaded by KDSItemViewSet
+            queryset = KDSStation.objects.only('id')
+        else:
+            # Same rule as KDSStation.active_orders, counted in one query for the whole page
+            queryset = super().get_queryset().annotate(
+                active_orders_count=Count(
+                    'kds_items__order_item__order',
+                    distinct=True,
+                    filter=Q(
+                        kds_items__order_item__order__status__in=['confirmed', 'processing', 'ready'],
+                        kds_items__order_item__order__branch=F('branch')
+                    )
+                )
+            )
         branch_id = get_request_branch_id(self.request)
         if branch_id:
             queryset = queryset.filter(branch_id=branch_id)
@@ -41,17 +103,12 @@ class KDSStationViewSet(viewsets.ModelViewSet):
     def items(self, request, pk=None):
         """
         Get all items for a specific station.
+
+        Deprecated: use /kds/items/?station=<id>. Kept as a thin wrapper over
+        the item list so it shares its queryset, filters and pagination.
         """
         station = self.get_object()
-        items = station.kds_items.all()
-        
-        # Filter by status if provided
-        status_param = request.query_params.get('status')
-        if status_param:
-            items = items.filter(status=status_param)
-            
-        serializer = KDSItemSerializer(items, many=True)
-        return Response(serializer.data)
+        return KDSItemViewSet.as_view({'get': 'list'})(request._request, station_pk=station.pk)
 
 
 class KDSItemViewSet(viewsets.ModelViewSet):
@@ -66,17 +123,49 @@ class KDSItemViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'description', 'kitchen_notes', 'order_item__product__name']
     ordering_fields = ['created_at', 'updated_at', 'completed_at']
     ordering = ['-created_at']
+    # Read-only collection actions served by the compact list serializer
+    list_actions = ('list', 'active', 'completed')
+
+    def get_serializer_class(self):
+        if self.action in self.list_actions:
+            return KDSItemListSerializer
+        return super().get_serializer_class()
+
+    def get_serializer_context(self):
+        # One clock reading per response for the time_since_created/time_in_status columns
+        context = super().get_serializer_context()
+        context['now'] = timezone.now()
+        return context
 
     def get_queryset(self):
         """
         Optionally filter by branch if provided in query params.
         """
-        queryset = super().get_queryset()
+        if self.action in self.list_actions:
+            queryset = with_list_columns(super().get_queryset())
+        else:
+            queryset = with_item_relations(super().get_queryset())
+        # Set when called through KDSStationViewSet.items
+        station_pk = self.kwargs.get('station_pk')
+        if station_pk:
+            queryset = queryset.filter(station_id=station_pk)
+        # Only read-only list actions; writes change updated_at after the query ran
+        if self.action in self.list_actions:
+            queryset = with_elapsed_minutes(queryset)
         branch_id = get_request_branch_id(self.request)
         if branch_id:
             queryset = queryset.filter(station__branch_id=branch_id)
         return queryset
 
+    def _paginated_response(self, queryset):
+        """Serialize one page of `queryset`, like ListModelMixin.list."""
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
     @action(detail=True, methods=['post'])
     def update_status(self, request, pk=None):
         """
@@ -88,7 +177,7 @@ class KDSItemViewSet(viewsets.ModelViewSet):
         if serializer.is_valid():
             serializer.update(item, serializer.validated_data)
             return Response(
-                KDSItemSerializer(item).data,
+                self.get_serializer(item).data,
                 status=status.HTTP_200_OK
             )
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -98,17 +187,15 @@ class KDSItemViewSet(viewsets.ModelViewSet):
         """
         Get all active KDS items (not completed or cancelled).
         """
-        active_items = self.get_queryset().exclude(
+        active_items = self.filter_queryset(self.get_queryset().exclude(
             status__in=['completed', 'cancelled']
-        )
-        serializer = self.get_serializer(active_items, many=True)
-        return Response(serializer.data)
+        ))
+        return self._paginated_response(active_items)
 
     @action(detail=False, methods=['get'])
     def completed(self, request):
         """
         Get all completed KDS items.
         """
-        completed_items = self.get_queryset().filter(status='completed')
-        serializer = self.get_serializer(completed_items, many=True)
-        return Response(serializer.data)
+        completed_items = self.filter_queryset(self.get_queryset().filter(status='completed'))
+        return self._paginated_response(completed_items)
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
-from django.db.models import Sum, Count
+from django.db.models import Count
 
 from .models import (
     LoyaltyProgram,
@@ -22,8 +22,12 @@ class LoyaltyTierInline(admin.TabularInline):
     )
     readonly_fields = ('get_customer_count',)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_customer_counts()
+
     def get_customer_count(self, obj):
-        return obj.get_customer_count()
+        # Blank extra forms are unsaved and carry no annotation
+        return getattr(obj, 'customer_count', 0)
     get_customer_count.short_description = _('Customer Count')
     get_customer_count.admin_order_field = 'customer_count'
 
@@ -55,17 +59,11 @@ class LoyaltyProgramAdmin(admin.ModelAdmin):
     total_members.short_description = _('Total Members')
 
     def total_points_earned(self, obj):
-        return LoyaltyTransaction.objects.filter(
-            program=obj,
-            transaction_type=LoyaltyTransaction.TransactionType.EARN
-        ).aggregate(Sum('points'))['points__sum'] or 0
+        return obj.point_totals['earned']
     total_points_earned.short_description = _('Total Points Earned')
 
     def total_points_redeemed(self, obj):
-        return LoyaltyTransaction.objects.filter(
-            program=obj,
-            transaction_type=LoyaltyTransaction.TransactionType.REDEEM
-        ).aggregate(Sum('points'))['points__sum'] or 0
+        return obj.point_totals['redeemed']
     total_points_redeemed.short_description = _('Total Points Redeemed')
 
 
@@ -104,8 +102,11 @@ class LoyaltyTierAdmin(admin.ModelAdmin):
     )
     readonly_fields = ('get_customer_count',)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('program').with_customer_counts()
+
     def get_customer_count(self, obj):
-        return obj.get_customer_count()
+        return obj.customer_count
     get_customer_count.short_description = _('Customer Count')
     get_customer_count.admin_order_field = 'customer_count'
 
@@ -156,9 +157,15 @@ class LoyaltyRewardAdmin(admin.ModelAdmin):
     )
     readonly_fields = ('get_redemptions_count',)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('program').annotate(
+            redemptions_count=Count('redemptions')
+        )
+
     def get_redemptions_count(self, obj):
-        return obj.redemptions.count()
+        return obj.redemptions_count
     get_redemptions_count.short_description = _('Redemptions')
+    get_redemptions_count.admin_order_field = 'redemptions_count'
 
 
 class LoyaltyRedemptionAdmin(admin.ModelAdmin):
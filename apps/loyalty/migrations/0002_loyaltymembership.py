@@ -0,0 +1,51 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Q, Sum
+
+
+def backfill_memberships(apps, schema_editor):
+    LoyaltyTransaction = apps.get_model('loyalty', 'LoyaltyTransaction')
+    LoyaltyMembership = apps.get_model('loyalty', 'LoyaltyMembership')
+    totals = LoyaltyTransaction.objects.values('customer_id', 'program_id').annotate(
+        earned=Sum('points', filter=Q(transaction_type='earn')),
+        redeemed=Sum('points', filter=Q(transaction_type='redeem')),
+        adjusted=Sum('points', filter=Q(transaction_type='adjust')),
+    ).order_by()
+    LoyaltyMembership.objects.bulk_create([
+        LoyaltyMembership(
+            customer_id=row['customer_id'],
+            program_id=row['program_id'],
+            balance=(row['earned'] or 0) + (row['adjusted'] or 0) - (row['redeemed'] or 0),
+            total_earned=row['earned'] or 0,
+        )
+        for row in totals
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0001_initial'),
+        ('loyalty', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoyaltyMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True, verbose_name='updated at')),
+                ('balance', models.IntegerField(default=0, help_text='Earned and adjusted points minus redeemed points', verbose_name='balance')),
+                ('total_earned', models.IntegerField(default=0, help_text='All points ever earned in this program', verbose_name='total earned')),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='loyalty_memberships', to='crm.customer', verbose_name='customer')),
+                ('program', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='loyalty.loyaltyprogram', verbose_name='loyalty program')),
+            ],
+            options={
+                'verbose_name': 'loyalty membership',
+                'verbose_name_plural': 'loyalty memberships',
+                'unique_together': {('customer', 'program')},
+            },
+        ),
+        migrations.RunPython(backfill_memberships, migrations.RunPython.noop),
+    ]
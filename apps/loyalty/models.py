@@ -1,9 +1,16 @@
-from django.db import models
+from bisect import bisect_right
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import IntegrityError, models, transaction
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator
 from django.utils.functional import cached_property
-from django.db.models import Sum
+from django.db.models import Count, F, IntegerField, OuterRef, Prefetch, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Upper
 
 from apps.base.models import TimestampedModel, SoftDeleteModel
 from apps.branches.models import Branch
@@ -11,6 +18,39 @@ from apps.crm.models import Customer
 from apps.sales.models import Order
 
 
+class LoyaltyProgramQuerySet(models.QuerySet):
+    def with_tiers(self):
+        """Prefetch each program's tiers in the order tier_for_points() bisects them."""
+        return self.prefetch_related(Prefetch(
+            'tiers',
+            queryset=LoyaltyTier.objects.order_by('minimum_points'),
+            to_attr='_tiers_by_minimum'
+        ))
+
+    def with_totals(self, *names):
+        """
+        Annotate `_total_members`, `_total_points_earned` and `_total_points_redeemed`.
+
+        Pass annotation names to attach only those.
+        """
+        # Correlated subqueries rather than joins so the three totals can't multiply each other
+        members = Customer.objects.filter(
+            loyalty_program=OuterRef('pk')
+        ).order_by().values('loyalty_program').annotate(count=Count('pk')).values('count')
+        transactions = LoyaltyTransaction.objects.filter(program=OuterRef('pk')).order_by().values('program')
+
+        def points(transaction_type):
+            total = transactions.annotate(total=Sum('points', filter=Q(transaction_type=transaction_type))).values('total')
+            return Coalesce(Subquery(total, output_field=IntegerField()), 0)
+
+        totals = {
+            '_total_members': Coalesce(Subquery(members, output_field=IntegerField()), 0),
+            '_total_points_earned': points(LoyaltyTransaction.TransactionType.EARN),
+            '_total_points_redeemed': points(LoyaltyTransaction.TransactionType.REDEEM),
+        }
+        return self.annotate(**{name: total for name, total in totals.items() if not names or name in names})
+
+
 class LoyaltyProgram(TimestampedModel, SoftDeleteModel):
     """
     Represents a loyalty program that customers can be enrolled in.
@@ -36,6 +76,8 @@ class LoyaltyProgram(TimestampedModel, SoftDeleteModel):
     points_expiry_days = models.PositiveIntegerField(_('points expiry days'),default=365,help_text=_('Number of days after which points expire'))
     branch = models.ForeignKey(Branch,on_delete=models.PROTECT,related_name='loyalty_programs',verbose_name=_('branch'),null=True,blank=True)
     
+    objects = LoyaltyProgramQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('loyalty program')
         verbose_name_plural = _('loyalty programs')
@@ -54,20 +96,24 @@ class LoyaltyProgram(TimestampedModel, SoftDeleteModel):
         """Calculate loyalty points for a given amount."""
         return amount * self.points_per_dollar
     
-    def is_points_valid(self, points):
-        """Check if points are valid (not expired)."""
-        valid_points = LoyaltyTransaction.objects.filter(
-            customer__loyalty_program=self,
-            transaction_type=LoyaltyTransaction.TransactionType.EARN,
-            created_at__gte=timezone.now() - timezone.timedelta(days=self.points_expiry_days)
-        ).aggregate(Sum('points'))['points__sum'] or 0
+    def is_points_valid(self, points, customer: Customer):
+        """Check if the customer has enough valid (unexpired) points in this program."""
+        # The membership balance is an upper bound on the valid points, so most
+        # shortfalls are answered from one indexed row without aggregating
+        balance = LoyaltyMembership.objects.filter(
+            customer=customer, program=self
+        ).values_list('balance', flat=True).first() or 0
+        if balance < points:
+            return False
         
-        redeemed_points = LoyaltyTransaction.objects.filter(
-            customer__loyalty_program=self,
-            transaction_type=LoyaltyTransaction.TransactionType.REDEEM
-        ).aggregate(Sum('points'))['points__sum'] or 0
-        
-        return valid_points - redeemed_points >= points
+        totals = LoyaltyTransaction.objects.filter(customer=customer, program=self).aggregate(
+            valid=Sum('points', filter=Q(
+                transaction_type=LoyaltyTransaction.TransactionType.EARN,
+                created_at__gte=timezone.now() - timezone.timedelta(days=self.points_expiry_days)
+            )),
+            redeemed=Sum('points', filter=Q(transaction_type=LoyaltyTransaction.TransactionType.REDEEM)),
+        )
+        return (totals['valid'] or 0) - (totals['redeemed'] or 0) >= points
     
     def process_order_points(self, order: Order):
         """Process loyalty points for a completed order."""
@@ -88,30 +134,81 @@ class LoyaltyProgram(TimestampedModel, SoftDeleteModel):
         
         return points
     
+    @cached_property
+    def _tier_thresholds(self):
+        """Tiers in ascending minimum_points order plus their thresholds, loaded once per instance."""
+        # Reuse LoyaltyProgram.objects.with_tiers() when the program came from it
+        tiers = getattr(self, '_tiers_by_minimum', None)
+        if tiers is None:
+            tiers = list(self.tiers.order_by('minimum_points'))
+        return tiers, [tier.minimum_points for tier in tiers]
+    
+    def tier_for_points(self, points):
+        """Return the highest tier whose minimum_points is covered by `points`."""
+        tiers, thresholds = self._tier_thresholds
+        index = bisect_right(thresholds, points)
+        return tiers[index - 1] if index else None
+    
+    @cached_property
+    def point_totals(self):
+        """Points earned and redeemed across the program, from one conditional aggregate."""
+        totals = self.transactions.aggregate(
+            earned=Sum('points', filter=Q(transaction_type=LoyaltyTransaction.TransactionType.EARN)),
+            redeemed=Sum('points', filter=Q(transaction_type=LoyaltyTransaction.TransactionType.REDEEM)),
+        )
+        return {key: total or 0 for key, total in totals.items()}
+    
+    def earned_points(self, customer: Customer):
+        """Total points the customer has earned in this program."""
+        return LoyaltyMembership.objects.filter(
+            customer=customer, program=self
+        ).values_list('total_earned', flat=True).first() or 0
+    
+    def sync_membership(self, customer: Customer):
+        """Recompute the customer's membership totals from their transactions."""
+        totals = LoyaltyTransaction.objects.filter(customer=customer, program=self).aggregate(
+            earned=Sum('points', filter=Q(transaction_type=LoyaltyTransaction.TransactionType.EARN)),
+            redeemed=Sum('points', filter=Q(transaction_type=LoyaltyTransaction.TransactionType.REDEEM)),
+            adjusted=Sum('points', filter=Q(transaction_type=LoyaltyTransaction.TransactionType.ADJUST)),
+        )
+        earned, redeemed, adjusted = (totals[key] or 0 for key in ('earned', 'redeemed', 'adjusted'))
+        membership, _ = LoyaltyMembership.objects.update_or_create(
+            customer=customer,
+            program=self,
+            defaults={'balance': earned + adjusted - redeemed, 'total_earned': earned}
+        )
+        return membership
+    
+    def get_tier(self, customer: Customer):
+        """Return the customer's current tier in this program."""
+        return self.tier_for_points(self.earned_points(customer))
+    
     def update_customer_tier(self, customer: Customer):
         """Update customer's loyalty tier based on their points."""
         if not customer:
-            return
-            
-        total_points = LoyaltyTransaction.objects.filter(
-            customer=customer,
-            program=self,
-            transaction_type=LoyaltyTransaction.TransactionType.EARN
-        ).aggregate(Sum('points'))['points__sum'] or 0
-        
-        current_tier = customer.loyalty_tier
-        new_tier = None
-        
-        # Find the highest tier that matches the points
-        for tier in self.tiers.all().order_by('-minimum_points'):
-            if total_points >= tier.minimum_points:
-                new_tier = tier
-                break
-        
-        # Update tier if changed
-        if new_tier and new_tier != current_tier:
-            customer.loyalty_tier = new_tier
-            customer.save()
+            return None
+        # Customer.loyalty_tier is derived from earned points via get_tier(), so
+        # there is nothing to persist: one SUM and a bisect over cached thresholds
+        return self.get_tier(customer)
+
+
+class LoyaltyTierQuerySet(models.QuerySet):
+    def with_customer_counts(self):
+        """Annotate `customer_count`: members whose earned points fall in the tier's band."""
+        next_minimum = LoyaltyTier.objects.filter(
+            program=OuterRef('program'),
+            minimum_points__gt=OuterRef('minimum_points')
+        ).order_by('minimum_points').values('minimum_points')[:1]
+        members_in_band = LoyaltyMembership.objects.filter(
+            program=OuterRef('program'),
+            total_earned__gte=OuterRef('minimum_points'),
+            total_earned__lt=OuterRef('_next_minimum')
+        ).order_by().values('program').annotate(count=Count('pk')).values('count')
+        return self.annotate(
+            # The top tier has no upper bound
+            _next_minimum=Coalesce(Subquery(next_minimum), Value(2 ** 31 - 1)),
+            customer_count=Coalesce(Subquery(members_in_band, output_field=IntegerField()), 0)
+        )
 
 
 class LoyaltyTier(TimestampedModel, SoftDeleteModel):
@@ -125,6 +222,8 @@ class LoyaltyTier(TimestampedModel, SoftDeleteModel):
     discount_percentage = models.DecimalField(_('discount percentage'),max_digits=5,decimal_places=2,default=0,help_text=_('Discount percentage for this tier'))
     special_benefits = models.TextField(_('special benefits'),blank=True,help_text=_('Additional benefits for this tier'))
     
+    objects = LoyaltyTierQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('loyalty tier')
         verbose_name_plural = _('loyalty tiers')
@@ -139,7 +238,23 @@ class LoyaltyTier(TimestampedModel, SoftDeleteModel):
     
     def get_customer_count(self):
         """Get number of customers in this tier."""
-        return Customer.objects.filter(loyalty_tier=self).count()
+        # Tiers are derived from earned points, so count memberships in this tier's band
+        next_minimum = self.program.tiers.filter(
+            minimum_points__gt=self.minimum_points
+        ).order_by('minimum_points').values_list('minimum_points', flat=True).first()
+        members = self.program.memberships.filter(total_earned__gte=self.minimum_points)
+        if next_minimum is not None:
+            members = members.filter(total_earned__lt=next_minimum)
+        return members.count()
+    
+    def cached_customer_count(self):
+        """get_customer_count(), cached until the program's points or tiers change."""
+        key = _tier_customer_count_key(self)
+        count = cache.get(key)
+        if count is None:
+            count = self.get_customer_count()
+            cache.set(key, count, LOYALTY_COUNT_CACHE_TIMEOUT)
+        return count
 
 
 class LoyaltyTransaction(TimestampedModel, SoftDeleteModel):
@@ -168,16 +283,72 @@ class LoyaltyTransaction(TimestampedModel, SoftDeleteModel):
             models.Index(fields=['customer']),
             models.Index(fields=['program']),
             models.Index(fields=['transaction_type']),
+            # Serves the viewset's notes search (icontains is UPPER(notes) LIKE on Postgres)
+            GinIndex(OpClass(Upper('notes'), name='gin_trgm_ops'), name='loyaltytxn_notes_trgm'),
         ]
     
     def __str__(self):
         return f"{self.get_transaction_type_display()} {self.points} points for {self.customer}"
     
+    @property
+    def balance_delta(self):
+        """Signed effect of this transaction on the member's balance."""
+        points = int(self.points)
+        return -points if self.transaction_type == self.TransactionType.REDEEM else points
+    
     def save(self, *args, **kwargs):
-        """Update customer's loyalty points after saving."""
-        super().save(*args, **kwargs)
-        self.customer.refresh_from_db()
-        self.customer.save()
+        """Apply the transaction to the membership totals and touch the customer."""
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                # Edits move points between rows or amounts, so take the stored
+                # version back out first; the row lock orders concurrent edits
+                previous = LoyaltyTransaction.objects.select_for_update().only(
+                    'customer', 'program', 'transaction_type', 'points'
+                ).filter(pk=self.pk).first()
+            super().save(*args, **kwargs)
+            if previous is not None:
+                LoyaltyMembership.apply(previous, sign=-1)
+            LoyaltyMembership.apply(self)
+        # Customer keeps no points column, so the old refresh_from_db() + save()
+        # only ever bumped updated_at; do that with one UPDATE
+        Customer.objects.filter(pk=self.customer_id).update(updated_at=timezone.now())
+
+
+class LoyaltyMembership(TimestampedModel):
+    """
+    Running point totals for a customer in a loyalty program.
+    Maintained by LoyaltyTransaction.save() and its post_delete receiver so
+    balance checks read one row.
+    """
+    customer = models.ForeignKey(Customer,on_delete=models.CASCADE,related_name='loyalty_memberships',verbose_name=_('customer'))
+    program = models.ForeignKey(LoyaltyProgram,on_delete=models.CASCADE,related_name='memberships',verbose_name=_('loyalty program'))
+    balance = models.IntegerField(_('balance'),default=0,help_text=_('Earned and adjusted points minus redeemed points'))
+    total_earned = models.IntegerField(_('total earned'),default=0,help_text=_('All points ever earned in this program'))
+    
+    class Meta:
+        verbose_name = _('loyalty membership')
+        verbose_name_plural = _('loyalty memberships')
+        unique_together = (('customer', 'program'),)
+    
+    def __str__(self):
+        return f"{self.customer} in {self.program.name}: {self.balance} points"
+    
+    @classmethod
+    def apply(cls, txn: LoyaltyTransaction, sign=1):
+        """Add (sign=1) or remove (sign=-1) a transaction's points with a single UPDATE."""
+        delta = sign * txn.balance_delta
+        earned = delta if txn.transaction_type == LoyaltyTransaction.TransactionType.EARN else 0
+        members = cls.objects.filter(customer_id=txn.customer_id, program_id=txn.program_id)
+        if members.update(balance=F('balance') + delta, total_earned=F('total_earned') + earned) or sign < 0:
+            # Nothing to take points out of when the row was never created
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(customer_id=txn.customer_id, program_id=txn.program_id, balance=delta, total_earned=earned)
+        except IntegrityError:
+            # Another writer created the row first
+            members.update(balance=F('balance') + delta, total_earned=F('total_earned') + earned)
 
 
 class LoyaltyReward(TimestampedModel, SoftDeleteModel):
@@ -207,6 +378,15 @@ class LoyaltyReward(TimestampedModel, SoftDeleteModel):
     def __str__(self):
         return f"{self.name} ({self.points_required} points)"
     
+    def cached_redemptions_count(self):
+        """Number of redemptions, cached until one is added or removed."""
+        key = _reward_redemptions_count_key(self.pk)
+        count = cache.get(key)
+        if count is None:
+            count = self.redemptions.count()
+            cache.set(key, count, LOYALTY_COUNT_CACHE_TIMEOUT)
+        return count
+    
     def is_available(self):
         """Check if reward is available for redemption."""
         return self.is_active and self.stock_quantity > 0
@@ -216,7 +396,7 @@ class LoyaltyReward(TimestampedModel, SoftDeleteModel):
         if not self.is_available():
             raise ValueError(_('This reward is not currently available'))
             
-        if not self.program.is_points_valid(self.points_required):
+        if not self.program.is_points_valid(self.points_required, customer):
             raise ValueError(_('Insufficient points for this reward'))
             
         # Create redemption record
@@ -255,3 +435,42 @@ class LoyaltyRedemption(TimestampedModel, SoftDeleteModel):
     def get_order_amount(self):
         """Get the order amount if this redemption was part of an order."""
         return self.order.total_amount if self.order else None
+
+
+LOYALTY_COUNT_CACHE_TIMEOUT = 60
+
+
+def _tier_counts_version_key(program_id):
+    return f'loyalty_tier_counts:{program_id}:version'
+
+
+def _tier_customer_count_key(tier):
+    # Versioned per program: one bump invalidates every tier's count
+    version = cache.get_or_set(_tier_counts_version_key(tier.program_id), 1, None)
+    return f'loyalty_tier_customer_count:{tier.program_id}:{version}:{tier.pk}'
+
+
+def _reward_redemptions_count_key(reward_id):
+    return f'loyalty_reward_redemptions_count:{reward_id}'
+
+
+@receiver(post_delete, sender=LoyaltyTransaction)
+def reverse_membership_totals(sender, instance, **kwargs):
+    """Take a deleted transaction's points back out of its membership."""
+    LoyaltyMembership.apply(instance, sign=-1)
+
+
+@receiver([post_save, post_delete], sender=LoyaltyTransaction)
+@receiver([post_save, post_delete], sender=LoyaltyTier)
+def bump_tier_counts_version(sender, instance, **kwargs):
+    """Points or tier bands changed, so the program's cached tier counts are stale."""
+    key = _tier_counts_version_key(instance.program_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+
+
+@receiver([post_save, post_delete], sender=LoyaltyRedemption)
+def clear_reward_redemptions_count(sender, instance, **kwargs):
+    cache.delete(_reward_redemptions_count_key(instance.reward_id))
@@ -1,12 +1,12 @@
 from rest_framework import serializers
 from django.utils import timezone
-from django.db.models import Sum
 from django.utils.translation import gettext_lazy as _
 
+from apps.base.serializers import CachedModelSerializer, ObjectCountField, without_unrequested_counts
 from .models import LoyaltyProgram,LoyaltyTier,LoyaltyTransaction,LoyaltyReward,LoyaltyRedemption
 
 
-class LoyaltyTierSerializer(serializers.ModelSerializer):
+class LoyaltyTierSerializer(CachedModelSerializer):
     """Serializer for LoyaltyTier model."""
     customer_count = serializers.SerializerMethodField()
     
@@ -23,10 +23,13 @@ class LoyaltyTierSerializer(serializers.ModelSerializer):
         ]
     
     def get_customer_count(self, obj):
-        return obj.get_customer_count()
+        # Annotated by LoyaltyTier.objects.with_customer_counts() on list querysets
+        if hasattr(obj, 'customer_count'):
+            return obj.customer_count
+        return obj.cached_customer_count()
 
 
-class LoyaltyTransactionSerializer(serializers.ModelSerializer):
+class LoyaltyTransactionSerializer(CachedModelSerializer):
     """Serializer for LoyaltyTransaction model."""
     order_amount = serializers.SerializerMethodField()
     
@@ -45,10 +48,13 @@ class LoyaltyTransactionSerializer(serializers.ModelSerializer):
         ]
     
     def get_order_amount(self, obj):
+        # Annotated by the viewset; a LEFT JOIN yields None when there is no order
+        if hasattr(obj, '_order_amount'):
+            return obj._order_amount
         return obj.reference_order.total_amount if obj.reference_order else None
 
 
-class LoyaltyRewardSerializer(serializers.ModelSerializer):
+class LoyaltyRewardSerializer(CachedModelSerializer):
     """Serializer for LoyaltyReward model."""
     redemptions_count = serializers.SerializerMethodField()
     
@@ -67,10 +73,12 @@ class LoyaltyRewardSerializer(serializers.ModelSerializer):
         ]
     
     def get_redemptions_count(self, obj):
-        return obj.redemptions.count()
+        if hasattr(obj, 'redemptions_count'):
+            return obj.redemptions_count
+        return obj.cached_redemptions_count()
 
 
-class LoyaltyRedemptionSerializer(serializers.ModelSerializer):
+class LoyaltyRedemptionSerializer(CachedModelSerializer):
     """Serializer for LoyaltyRedemption model."""
     order_amount = serializers.SerializerMethodField()
     
@@ -88,16 +96,21 @@ class LoyaltyRedemptionSerializer(serializers.ModelSerializer):
         ]
     
     def get_order_amount(self, obj):
+        if hasattr(obj, '_order_amount'):
+            return obj._order_amount
         return obj.order.total_amount if obj.order else None
 
 
-class LoyaltyProgramSerializer(serializers.ModelSerializer):
-    """Serializer for LoyaltyProgram model."""
-    total_members = serializers.SerializerMethodField()
-    total_points_earned = serializers.SerializerMethodField()
-    total_points_redeemed = serializers.SerializerMethodField()
-    tiers = LoyaltyTierSerializer(many=True, read_only=True)
-    rewards = LoyaltyRewardSerializer(many=True, read_only=True)
+class LoyaltyProgramListSerializer(CachedModelSerializer):
+    """
+    Lean LoyaltyProgram serializer for the list endpoint; no nested tiers/rewards.
+
+    The totals are opt-in, e.g. ``?fields=total_members``: only the requested
+    ones are rendered, and the viewset annotates only those.
+    """
+    total_members = ObjectCountField('_total_members')
+    total_points_earned = ObjectCountField('_total_points_earned')
+    total_points_redeemed = ObjectCountField('_total_points_redeemed')
     
     class Meta:
         model = LoyaltyProgram
@@ -113,22 +126,99 @@ class LoyaltyProgramSerializer(serializers.ModelSerializer):
             'description',
             'total_members',
             'total_points_earned',
-            'total_points_redeemed',
+            'total_points_redeemed'
+        ]
+    
+    def get_fields(self):
+        return without_unrequested_counts(super().get_fields(), self.context.get('request'))
+
+
+class LoyaltyProgramSerializer(LoyaltyProgramListSerializer):
+    """Serializer for LoyaltyProgram model."""
+    total_members = serializers.SerializerMethodField()
+    total_points_earned = serializers.SerializerMethodField()
+    total_points_redeemed = serializers.SerializerMethodField()
+    tiers = LoyaltyTierSerializer(many=True, read_only=True)
+    rewards = LoyaltyRewardSerializer(many=True, read_only=True)
+    
+    class Meta:
+        model = LoyaltyProgram
+        fields = LoyaltyProgramListSerializer.Meta.fields + [
             'tiers',
             'rewards'
         ]
     
+    # The viewset annotates these via LoyaltyProgram.objects.with_totals();
+    # the queries below only run for instances that didn't come from it
     def get_total_members(self, obj):
+        if hasattr(obj, '_total_members'):
+            return obj._total_members
         return obj.members.count()
     
     def get_total_points_earned(self, obj):
-        return LoyaltyTransaction.objects.filter(
-            program=obj,
-            transaction_type=LoyaltyTransaction.TransactionType.EARN
-        ).aggregate(Sum('points'))['points__sum'] or 0
+        if hasattr(obj, '_total_points_earned'):
+            return obj._total_points_earned
+        return obj.point_totals['earned']
     
     def get_total_points_redeemed(self, obj):
-        return LoyaltyTransaction.objects.filter(
-            program=obj,
-            transaction_type=LoyaltyTransaction.TransactionType.REDEEM
-        ).aggregate(Sum('points'))['points__sum'] or 0
+        if hasattr(obj, '_total_points_redeemed'):
+            return obj._total_points_redeemed
+        return obj.point_totals['redeemed']
+
+
+class CustomerLoyaltySerializer(serializers.Serializer):
+    """
+    Read-only loyalty summary for a customer.
+
+    Built entirely from what CustomerLoyaltyView prefetches: the customer's
+    memberships, the program's tiers and active rewards, and the five most
+    recent transactions.
+    """
+    customer = serializers.SerializerMethodField()
+    program = serializers.SerializerMethodField()
+    recent_transactions = LoyaltyTransactionSerializer(many=True, read_only=True)
+    available_rewards = serializers.SerializerMethodField()
+
+    def _membership(self, customer):
+        return next(
+            (m for m in customer.loyalty_memberships.all() if m.program_id == customer.loyalty_program_id),
+            None
+        )
+
+    def get_customer(self, customer):
+        program = customer.loyalty_program
+        membership = self._membership(customer)
+        # Same result as Customer.loyalty_tier, resolved from the prefetched rows
+        tier = program.tier_for_points(membership.total_earned if membership else 0) if program else None
+        # Same strings as Customer.__str__ and LoyaltyTier.__str__, from the loaded columns
+        if customer.user:
+            name = f"{customer.user.get_full_name()} ({customer.customer_code})"
+        else:
+            name = f"Guest Customer {customer.customer_code}"
+        return {
+            'id': customer.id,
+            'name': name,
+            'total_points': membership.balance if membership else 0,
+            'current_tier': {
+                'id': tier.id if tier else None,
+                'name': f"{program.name} - {tier.name}" if tier else None
+            }
+        }
+
+    def get_program(self, customer):
+        program = customer.loyalty_program
+        if not program:
+            return None
+        return {
+            'id': program.id,
+            'name': program.name,
+            'type': program.program_type,
+            'points_per_dollar': float(program.points_per_dollar),
+            'minimum_points_for_reward': program.minimum_points_for_reward
+        }
+
+    def get_available_rewards(self, customer):
+        program = customer.loyalty_program
+        if not program:
+            return []
+        return LoyaltyRewardSerializer(program.active_rewards, many=True).data
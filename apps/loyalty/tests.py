@@ -1,3 +1,111 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+
+from apps.crm.models import Customer
+from .models import LoyaltyMembership, LoyaltyProgram, LoyaltyTransaction
+
+
+class LoyaltyMembershipTotalsTest(TestCase):
+    """The membership row follows transactions as they are created, edited and deleted."""
+
+    def setUp(self):
+        self.program = LoyaltyProgram.objects.create(name='Rewards')
+        self.customer = Customer.objects.create(customer_code='CUST00000001')
+
+    def earn(self, points, **kwargs):
+        return LoyaltyTransaction.objects.create(
+            customer=self.customer, program=self.program, points=points, **kwargs
+        )
+
+    def membership(self):
+        return LoyaltyMembership.objects.get(customer=self.customer, program=self.program)
+
+    def assertTotals(self, balance, total_earned):
+        membership = self.membership()
+        self.assertEqual(membership.balance, balance)
+        self.assertEqual(membership.total_earned, total_earned)
+
+    def test_create_adds_points(self):
+        self.earn(100)
+        LoyaltyTransaction.objects.create(
+            customer=self.customer, program=self.program, points=30,
+            transaction_type=LoyaltyTransaction.TransactionType.REDEEM
+        )
+        self.assertTotals(balance=70, total_earned=100)
+
+    def test_update_applies_the_difference(self):
+        txn = self.earn(100)
+        txn.points = 40
+        txn.save()
+        self.assertTotals(balance=40, total_earned=40)
+
+    def test_update_to_redeem_moves_points_out_of_earned(self):
+        self.earn(100)
+        txn = self.earn(20)
+        txn.transaction_type = LoyaltyTransaction.TransactionType.REDEEM
+        txn.save()
+        self.assertTotals(balance=80, total_earned=100)
+
+    def test_update_to_another_customer_moves_the_points(self):
+        other = Customer.objects.create(customer_code='CUST00000002')
+        txn = self.earn(50)
+        txn.customer = other
+        txn.save()
+        self.assertTotals(balance=0, total_earned=0)
+        membership = LoyaltyMembership.objects.get(customer=other, program=self.program)
+        self.assertEqual(membership.balance, 50)
+
+    def test_notes_only_update_leaves_totals(self):
+        txn = self.earn(100)
+        txn.notes = 'Checked'
+        txn.save()
+        self.assertTotals(balance=100, total_earned=100)
+
+    def test_delete_reverses_points(self):
+        self.earn(100)
+        txn = self.earn(25)
+        txn.delete()
+        self.assertTotals(balance=100, total_earned=100)
+
+    def test_queryset_delete_reverses_points(self):
+        self.earn(100)
+        self.earn(25)
+        LoyaltyTransaction.objects.filter(points=25).delete()
+        self.assertTotals(balance=100, total_earned=100)
+
+    def test_matches_sync_membership(self):
+        txn = self.earn(100)
+        self.earn(10, transaction_type=LoyaltyTransaction.TransactionType.ADJUST)
+        txn.points = 60
+        txn.save()
+        expected = self.membership()
+        synced = self.program.sync_membership(self.customer)
+        self.assertEqual((synced.balance, synced.total_earned), (expected.balance, expected.total_earned))
+
+
+class IsPointsValidTest(TestCase):
+    def setUp(self):
+        self.program = LoyaltyProgram.objects.create(name='Rewards', points_expiry_days=30)
+        self.customer = Customer.objects.create(customer_code='CUST00000003')
+        LoyaltyTransaction.objects.create(customer=self.customer, program=self.program, points=100)
+
+    def test_balance_shortfall_reads_one_row(self):
+        with self.assertNumQueries(1):
+            self.assertFalse(self.program.is_points_valid(150, self.customer))
+
+    def test_enough_points(self):
+        self.assertTrue(self.program.is_points_valid(100, self.customer))
+
+    def test_expired_points_fail_after_balance_check(self):
+        LoyaltyTransaction.objects.filter(customer=self.customer).update(
+            created_at=timezone.now() - timedelta(days=31)
+        )
+        # The balance still covers it, so the expiry aggregate decides
+        self.assertFalse(self.program.is_points_valid(100, self.customer))
 
-# Create your tests here.
+    def test_deleted_transaction_no_longer_counts(self):
+        LoyaltyTransaction.objects.get(customer=self.customer).delete()
+        with self.assertNumQueries(1):
+            self.assertFalse(self.program.is_points_valid(1, self.customer))
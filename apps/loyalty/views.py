@@ -7,8 +7,10 @@ from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.decorators import action
+from django.db.models import Count, F, Prefetch
 from apps.sales.models import Order
 from apps.crm.models import Customer
+from apps.base.serializers import requested_count_annotations
 
 from .models import (
     LoyaltyProgram,
@@ -19,12 +21,28 @@ from .models import (
 )
 from .serializers import (
     LoyaltyProgramSerializer,
+    LoyaltyProgramListSerializer,
     LoyaltyTierSerializer,
     LoyaltyTransactionSerializer,
     LoyaltyRewardSerializer,
-    LoyaltyRedemptionSerializer
+    LoyaltyRedemptionSerializer,
+    CustomerLoyaltySerializer
 )
 
+# Columns each serializer reads; list/retrieve querysets load only these
+PROGRAM_FIELDS = (
+    'id', 'name', 'program_type', 'status', 'points_per_dollar', 'minimum_points_for_reward',
+    'points_expiry_days', 'branch', 'description'
+)
+TIER_FIELDS = ('id', 'program', 'name', 'minimum_points', 'discount_percentage', 'special_benefits')
+TRANSACTION_FIELDS = (
+    'id', 'customer', 'program', 'transaction_type', 'points', 'reference_order', 'notes', 'created_at'
+)
+REWARD_FIELDS = (
+    'id', 'program', 'name', 'description', 'points_required', 'value', 'stock_quantity', 'is_active'
+)
+REDEMPTION_FIELDS = ('id', 'customer', 'reward', 'transaction', 'order', 'notes', 'created_at')
+
 
 class LoyaltyProgramViewSet(viewsets.ModelViewSet):
     """ViewSet for managing loyalty programs."""
@@ -40,6 +58,30 @@ class LoyaltyProgramViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'description']
     ordering_fields = ['created_at', 'updated_at']
 
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return LoyaltyProgramListSerializer
+        return super().get_serializer_class()
+
+    def get_queryset(self):
+        """Totals and nested tier/reward counts in a fixed number of queries per page."""
+        queryset = super().get_queryset()
+        if self.action == 'process_order':
+            # Only the program row itself is used to award points
+            return queryset
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.only(*PROGRAM_FIELDS)
+        if self.action == 'list':
+            # No tiers or rewards on the list, and only the totals asked for via ?fields=
+            annotations = requested_count_annotations(LoyaltyProgramListSerializer, self.request)
+            return queryset.with_totals(*annotations) if annotations else queryset
+        return queryset.with_totals().prefetch_related(
+            Prefetch('tiers', queryset=LoyaltyTier.objects.only(*TIER_FIELDS).with_customer_counts()),
+            Prefetch('rewards', queryset=LoyaltyReward.objects.only(*REWARD_FIELDS).annotate(
+                redemptions_count=Count('redemptions')
+            )),
+        )
+
     def perform_create(self, serializer):
         """Save the program with the current user as the creator."""
         serializer.save(created_by=self.request.user)
@@ -57,7 +99,8 @@ class LoyaltyProgramViewSet(viewsets.ModelViewSet):
             )
             
         try:
-            order = Order.objects.get(id=order_id)
+            # process_order_points() reads order.customer; join it up front
+            order = Order.objects.select_related('customer').get(id=order_id)
             points = program.process_order_points(order)
             return Response({'points_earned': points})
         except Order.DoesNotExist:
@@ -80,6 +123,12 @@ class LoyaltyTierViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'program__name']
     ordering_fields = ['minimum_points']
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.only(*TIER_FIELDS)
+        return queryset.with_customer_counts()
+
     def perform_create(self, serializer):
         """Save the tier with the current user as the creator."""
         serializer.save(created_by=self.request.user)
@@ -103,6 +152,16 @@ class LoyaltyTransactionViewSet(viewsets.ModelViewSet):
     ]
     ordering_fields = ['created_at']
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # order_amount needs one column of the order, not the whole row. Reads only:
+        # after an update the annotation would still hold the old order's amount
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.only(*TRANSACTION_FIELDS).annotate(
+                _order_amount=F('reference_order__total_amount')
+            )
+        return queryset
+
     def perform_create(self, serializer):
         """Save the transaction with the current user as the creator."""
         serializer.save(created_by=self.request.user)
@@ -121,6 +180,15 @@ class LoyaltyRewardViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'program__name']
     ordering_fields = ['created_at']
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'redeem':
+            # LoyaltyReward.redeem() checks points against the program
+            return queryset.select_related('program')
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.only(*REWARD_FIELDS)
+        return queryset.annotate(redemptions_count=Count('redemptions'))
+
     def perform_create(self, serializer):
         """Save the reward with the current user as the creator."""
         serializer.save(created_by=self.request.user)
@@ -139,17 +207,19 @@ class LoyaltyRewardViewSet(viewsets.ModelViewSet):
             )
             
         try:
-            customer = Customer.objects.get(id=customer_id)
-            transaction = LoyaltyTransaction.objects.get(id=transaction_id)
+            # One query for both; the transaction must belong to the customer
+            transaction = LoyaltyTransaction.objects.select_related('customer').get(
+                id=transaction_id, customer_id=customer_id
+            )
             
             # Create redemption
-            reward.redeem(customer, transaction)
+            reward.redeem(transaction.customer, transaction)
             
             return Response(
                 {'message': 'Reward redeemed successfully'},
                 status=status.HTTP_200_OK
             )
-        except (Customer.DoesNotExist, LoyaltyTransaction.DoesNotExist):
+        except LoyaltyTransaction.DoesNotExist:
             return Response(
                 {'error': 'Customer or transaction not found'},
                 status=status.HTTP_404_NOT_FOUND
@@ -172,6 +242,14 @@ class LoyaltyRedemptionViewSet(viewsets.ModelViewSet):
     ]
     ordering_fields = ['created_at']
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # order_amount needs one column of the order, not the whole row. Reads only:
+        # after an update the annotation would still hold the old order's amount
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.only(*REDEMPTION_FIELDS).annotate(_order_amount=F('order__total_amount'))
+        return queryset
+
     def perform_create(self, serializer):
         """Save the redemption with the current user as the creator."""
         serializer.save(created_by=self.request.user)
@@ -180,42 +258,40 @@ class LoyaltyRedemptionViewSet(viewsets.ModelViewSet):
 class CustomerLoyaltyView(generics.RetrieveAPIView):
     """View to get customer's loyalty information."""
     permission_classes = [permissions.IsAuthenticated]
+    serializer_class = CustomerLoyaltySerializer
+
+    def get_queryset(self):
+        # Everything CustomerLoyaltySerializer reads, in a fixed handful of queries,
+        # loading only the customer and user columns it renders
+        return Customer.objects.select_related('loyalty_program', 'user').only(
+            'id', 'customer_code', 'loyalty_program', 'user', 'user__first_name', 'user__last_name'
+        ).prefetch_related(
+            'loyalty_memberships',
+            Prefetch(
+                'loyalty_transactions',
+                queryset=LoyaltyTransaction.objects.only(*TRANSACTION_FIELDS).annotate(
+                    _order_amount=F('reference_order__total_amount')
+                ).order_by('-created_at')[:5],
+                to_attr='recent_transactions'
+            ),
+            Prefetch(
+                'loyalty_program__tiers',
+                queryset=LoyaltyTier.objects.only(*TIER_FIELDS).order_by('minimum_points'),
+                to_attr='_tiers_by_minimum'
+            ),
+            Prefetch(
+                'loyalty_program__rewards',
+                queryset=LoyaltyReward.objects.only(*REWARD_FIELDS).filter(is_active=True).annotate(redemptions_count=Count('redemptions')),
+                to_attr='active_rewards'
+            ),
+        )
 
     def get(self, request, customer_id):
         try:
-            customer = Customer.objects.get(id=customer_id)
-            program = customer.loyalty_program
-            
-            data = {
-                'customer': {
-                    'id': customer.id,
-                    'name': str(customer),
-                    'total_points': customer.total_points,
-                    'current_tier': {
-                        'id': customer.loyalty_tier.id if customer.loyalty_tier else None,
-                        'name': str(customer.loyalty_tier) if customer.loyalty_tier else None
-                    }
-                },
-                'program': {
-                    'id': program.id,
-                    'name': program.name,
-                    'type': program.program_type,
-                    'points_per_dollar': float(program.points_per_dollar),
-                    'minimum_points_for_reward': program.minimum_points_for_reward
-                },
-                'recent_transactions': LoyaltyTransactionSerializer(
-                    customer.loyalty_transactions.all().order_by('-created_at')[:5],
-                    many=True
-                ).data,
-                'available_rewards': LoyaltyRewardSerializer(
-                    program.rewards.filter(is_active=True),
-                    many=True
-                ).data
-            }
-            
-            return Response(data)
+            customer = self.get_queryset().get(id=customer_id)
         except Customer.DoesNotExist:
             return Response(
                 {'error': 'Customer not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
+        return Response(self.get_serializer(customer).data)
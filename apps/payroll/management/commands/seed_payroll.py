@@ -3,6 +3,7 @@ from datetime import timedelta
 from decimal import Decimal
 from django.core.management.base import BaseCommand
 from django.utils import timezone
+from django.db import transaction
 from django.contrib.auth import get_user_model
 from apps.employees.models import Employee
 from apps.payroll.models import (
@@ -10,7 +11,6 @@ from apps.payroll.models import (
 )
 from apps.accounting.models import Expense, ExpenseCategory, ExpenseAccount
 from apps.branches.models import Branch
-from apps.accounting.utils import generate_number
 
 User = get_user_model()
 
@@ -26,98 +26,108 @@ class Command(BaseCommand):
         admin_email = options['admin_email']
         now = timezone.now().date()
 
-        # Purge all payroll and related expense data
-        self.stdout.write(self.style.WARNING('Deleting all payroll, payroll item, and related expense data...'))
-        EmployeePayroll.objects.all().delete()
-        PayrollPeriod.objects.all().delete()
-        PayrollItem.objects.all().delete()
-        Expense.objects.filter(expense_type='payroll').delete()
-        self.stdout.write(self.style.SUCCESS('All payroll and related expense data deleted.'))
+        with transaction.atomic():
+            # Purge all payroll and related expense data
+            self.stdout.write(self.style.WARNING('Deleting all payroll, payroll item, and related expense data...'))
+            EmployeePayroll.objects.all().delete()
+            PayrollPeriod.objects.all().delete()
+            PayrollItem.objects.all().delete()
+            Expense.objects.filter(expense_type='payroll').delete()
+            self.stdout.write(self.style.SUCCESS('All payroll and related expense data deleted.'))
 
-        # Ensure admin user and employee profile
-        try:
-            admin = User.objects.get(email=admin_email)
-        except User.DoesNotExist:
-            self.stdout.write(self.style.ERROR(f"Admin user with email {admin_email} not found. Please create one."))
-            return
-        if not hasattr(admin, 'employee_profile'):
-            base_id = 'ADMIN001'
-            employee_id = base_id
-            counter = 1
-            while Employee.objects.filter(employee_id=employee_id).exists():
-                counter += 1
-                employee_id = f'{base_id}{counter}'
-            Employee.objects.create(user=admin, employee_id=employee_id, is_active=True)
-            self.stdout.write(self.style.WARNING(f"Created missing Employee profile for admin user {admin.email} (employee_id={employee_id})"))
-        admin_emp = admin.employee_profile
+            # Ensure admin user and employee profile
+            try:
+                admin = User.objects.get(email=admin_email)
+            except User.DoesNotExist:
+                self.stdout.write(self.style.ERROR(f"Admin user with email {admin_email} not found. Please create one."))
+                return
+            if not hasattr(admin, 'employee_profile'):
+                base_id = 'ADMIN001'
+                employee_id = base_id
+                counter = 1
+                while Employee.objects.filter(employee_id=employee_id).exists():
+                    counter += 1
+                    employee_id = f'{base_id}{counter}'
+                Employee.objects.create(user=admin, employee_id=employee_id, is_active=True)
+                self.stdout.write(self.style.WARNING(f"Created missing Employee profile for admin user {admin.email} (employee_id={employee_id})"))
+            admin_emp = admin.employee_profile
 
-        # Ensure at least one active employee
-        employees = Employee.objects.exclude(user__is_superuser=True)
-        if not employees:
-            self.stdout.write(self.style.ERROR('No active employees found. Please seed employees first.'))
-            return
+            # Ensure at least one active employee
+            employees = list(Employee.objects.exclude(user__is_superuser=True).select_related('user'))
+            if not employees:
+                self.stdout.write(self.style.ERROR('No active employees found. Please seed employees first.'))
+                return
 
-        # Create or get payroll expense account and category
-        expense_account, _ = ExpenseAccount.objects.get_or_create(
-            code='PAYROLL',
-            defaults={
-                'name': 'Payroll Expenses',
-                'account_type': 'operating',
-                'description': 'Payroll and salary related expenses',
-                'is_active': True
-            }
-        )
-        expense_category, _ = ExpenseCategory.objects.get_or_create(
-            name='Payroll',
-            defaults={
-                'description': 'Payroll and salary expenses',
-                'is_active': True,
-                'default_account': expense_account
-            }
-        )
-        if not expense_category.default_account:
-            expense_category.default_account = expense_account
-            expense_category.save()
-
-        # Fetch default branch or first branch
-        default_branch = Branch.objects.filter(is_default=True).first() or Branch.objects.first()
-        if not default_branch:
-            self.stdout.write(self.style.ERROR('No branches found. Please seed branches first.'))
-            return
-
-        # Seed payroll periods with status 'approved'
-        periods = []
-        for i in range(months):
-            period_date = now.replace(day=1) - timedelta(days=30 * i)
-            period_start = period_date.replace(day=1)
-            if period_start.month == 12:
-                period_end = period_start.replace(year=period_start.year + 1, month=1, day=1) - timedelta(days=1)
-            else:
-                period_end = period_start.replace(month=period_start.month + 1, day=1) - timedelta(days=1)
-            period, created = PayrollPeriod.objects.get_or_create(
-                start_date=period_start,
-                end_date=period_end,
+            # Create or get payroll expense account and category
+            expense_account, _ = ExpenseAccount.objects.get_or_create(
+                code='PAYROLL',
                 defaults={
-                    'status': 'approved',
-                    'created_by': admin_emp,
-                    'last_modified_by': admin_emp
+                    'name': 'Payroll Expenses',
+                    'account_type': 'operating',
+                    'description': 'Payroll and salary related expenses',
+                    'is_active': True
+                }
+            )
+            expense_category, _ = ExpenseCategory.objects.get_or_create(
+                name='Payroll',
+                defaults={
+                    'description': 'Payroll and salary expenses',
+                    'is_active': True,
+                    'default_account': expense_account
                 }
             )
-            if not created:
-                period.status = 'approved'
-                period.save()
-            periods.append(period)
-            if created:
-                self.stdout.write(self.style.SUCCESS(f'Created payroll period: {period}'))
+            if not expense_category.default_account:
+                expense_category.default_account = expense_account
+                expense_category.save()
 
-        # Seed payroll items for each employee (basic salary only)
-        for emp in employees:
-            # Create a basic salary payroll item if not exists
-            basic_item, _ = PayrollItem.objects.get_or_create(
+            # Fetch default branch or first branch
+            default_branch = Branch.objects.filter(is_default=True).first() or Branch.objects.first()
+            if not default_branch:
+                self.stdout.write(self.style.ERROR('No branches found. Please seed branches first.'))
+                return
+
+            # Seed payroll periods with status 'approved'
+            bounds = {}
+            for i in range(months):
+                period_date = now.replace(day=1) - timedelta(days=30 * i)
+                period_start = period_date.replace(day=1)
+                if period_start.month == 12:
+                    period_end = period_start.replace(year=period_start.year + 1, month=1, day=1) - timedelta(days=1)
+                else:
+                    period_end = period_start.replace(month=period_start.month + 1, day=1) - timedelta(days=1)
+                bounds.setdefault((period_start, period_end), None)
+            # One lookup, one UPDATE and one INSERT instead of a get_or_create per month
+            existing_periods = PayrollPeriod.objects.filter(start_date__in=[start for start, _end in bounds])
+            for period in existing_periods:
+                if (period.start_date, period.end_date) in bounds:
+                    bounds[period.start_date, period.end_date] = period
+            reused = [period for period in bounds.values() if period is not None]
+            PayrollPeriod.objects.filter(pk__in=[period.pk for period in reused]).update(
+                status='approved', last_modified_by=admin_emp, updated_at=timezone.now()
+            )
+            new_periods = PayrollPeriod.objects.bulk_create([
+                PayrollPeriod(
+                    start_date=start,
+                    end_date=end,
+                    status='approved',
+                    created_by=admin_emp,
+                    last_modified_by=admin_emp
+                )
+                for (start, end), period in bounds.items() if period is None
+            ])
+            periods = reused + new_periods
+            # One styled write for the whole batch rather than one per period
+            if new_periods:
+                self.stdout.write(self.style.SUCCESS('\n'.join(
+                    f'Created payroll period: {period}' for period in new_periods
+                )))
+
+            # Basic salary payroll item; one row shared by every employee
+            PayrollItem.objects.get_or_create(
                 name='Basic Salary',
                 item_type='salary',
                 defaults={
-                    'amount': emp.salary or 0,
+                    'amount': employees[0].salary or 0,
                     'is_percentage': False,
                     'is_tax_deductible': False,
                     'created_by': admin_emp,
@@ -125,10 +135,23 @@ class Command(BaseCommand):
                 }
             )
 
-        # Seed employee payrolls for each period and employee, with status 'paid', and link an Expense
-        for period in periods:
-            for emp in employees:
-                try:
+            # Seed employee payrolls for each period and employee, with status 'paid', and link an Expense.
+            # Expense.save() runs full_clean(), which bulk_create skips; only clean() is
+            # repeated here since the related rows were all loaded above
+            expense_prefix = f"EX{timezone.now().strftime('%Y%m%d')}-P"
+            # Continue after today's highest seeded number, read once for the whole run
+            last_number = Expense.objects.filter(
+                expense_number__startswith=expense_prefix
+            ).order_by('-expense_number').values_list('expense_number', flat=True).first()
+            expense_base = int(last_number[len(expense_prefix):]) if last_number else 0
+            # Payrolls that already exist for these periods, fetched once instead of per pair
+            existing = {
+                (payroll.employee_id, payroll.payroll_period_id): payroll
+                for payroll in EmployeePayroll.objects.filter(payroll_period__in=periods)
+            }
+            expenses, to_create, to_update = [], [], []
+            for period in periods:
+                for emp in employees:
                     basic_salary = emp.salary or 0
                     gross_pay = basic_salary
                     total_deductions = Decimal('0.00')
@@ -136,8 +159,9 @@ class Command(BaseCommand):
                     payment_date = period.end_date
                     payment_method = 'bank_transfer'
                     payment_reference = f'PAY-{emp.employee_id}-{period.start_date}'
-                    # Create expense
                     expense = Expense(
+                        # Sequential from expense_base; the P keeps it apart from generate_number('EX')
+                        expense_number=f'{expense_prefix}{expense_base + len(expenses) + 1:05d}',
                         expense_date=payment_date,
                         payment_date=payment_date,
                         amount=net_pay,
@@ -153,38 +177,43 @@ class Command(BaseCommand):
                         created_by=admin,
                         last_modified_by=admin,
                     )
-                    expense.expense_number = generate_number('EX')
-                    expense.save()
-                    emp_payroll, created = EmployeePayroll.objects.get_or_create(
-                        employee=emp,
-                        payroll_period=period,
-                        defaults={
-                            'basic_salary': basic_salary,
-                            'gross_pay': gross_pay,
-                            'total_deductions': total_deductions,
-                            'net_pay': net_pay,
-                            'status': 'paid',
-                            'payment_date': payment_date,
-                            'payment_method': payment_method,
-                            'payment_reference': payment_reference,
-                            'created_by': admin_emp,
-                            'last_modified_by': admin_emp,
-                            'expense': expense
-                        }
-                    )
-                    if not created:
-                        emp_payroll.basic_salary = basic_salary
-                        emp_payroll.gross_pay = gross_pay
-                        emp_payroll.total_deductions = total_deductions
-                        emp_payroll.net_pay = net_pay
-                        emp_payroll.status = 'paid'
-                        emp_payroll.payment_date = payment_date
-                        emp_payroll.payment_method = payment_method
-                        emp_payroll.payment_reference = payment_reference
-                        emp_payroll.expense = expense
-                        emp_payroll.save()
-                    self.stdout.write(self.style.SUCCESS(f'Created payroll and expense for {emp} - {period}'))
-                except Exception as e:
-                    self.stdout.write(self.style.ERROR(f'Error creating payroll for {emp} - {period}: {str(e)}'))
+                    expense.clean()
+                    expenses.append(expense)
+                    emp_payroll = existing.get((emp.pk, period.pk))
+                    if emp_payroll is None:
+                        emp_payroll = EmployeePayroll(
+                            employee=emp,
+                            payroll_period=period,
+                            created_by=admin_emp,
+                            last_modified_by=admin_emp
+                        )
+                        to_create.append(emp_payroll)
+                    else:
+                        to_update.append(emp_payroll)
+                    emp_payroll.basic_salary = basic_salary
+                    emp_payroll.gross_pay = gross_pay
+                    emp_payroll.total_deductions = total_deductions
+                    emp_payroll.net_pay = net_pay
+                    emp_payroll.status = 'paid'
+                    emp_payroll.payment_date = payment_date
+                    emp_payroll.payment_method = payment_method
+                    emp_payroll.payment_reference = payment_reference
+                    emp_payroll.expense = expense
+
+            # Postgres returns the expense pks, so the payroll rows can point at them
+            Expense.objects.bulk_create(expenses, batch_size=500)
+            EmployeePayroll.objects.bulk_create(to_create, batch_size=500)
+            EmployeePayroll.objects.bulk_update(
+                to_update,
+                fields=[
+                    'basic_salary', 'gross_pay', 'total_deductions', 'net_pay', 'status',
+                    'payment_date', 'payment_method', 'payment_reference', 'expense'
+                ],
+                batch_size=500
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'Created {len(to_create)} and updated {len(to_update)} payrolls, '
+                f'with {len(expenses)} expenses across {len(periods)} periods'
+            ))
 
-        self.stdout.write(self.style.SUCCESS('Payroll seeding complete.'))
+            self.stdout.write(self.style.SUCCESS('Payroll seeding complete.'))
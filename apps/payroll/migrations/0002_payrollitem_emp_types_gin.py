@@ -0,0 +1,16 @@
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payrollitem',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['applicable_employment_types'], name='payrollitem_emp_types_gin', opclasses=['jsonb_path_ops']),
+        ),
+    ]
@@ -0,0 +1,42 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('payroll', '0002_payrollitem_emp_types_gin'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='employeepayroll',
+            index=models.Index(fields=['payroll_period', 'employee'], name='emppayroll_period_emp_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='employeepayroll',
+            index=models.Index(fields=['status', 'payment_date'], name='emppayroll_status_paydate_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='workassignment',
+            index=models.Index(fields=['-work_date', '-start_time'], name='workassign_date_start_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='workassignment',
+            index=models.Index(fields=['status', 'work_date'], name='workassign_status_date_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='casualpayment',
+            index=models.Index(fields=['-period_start_date', '-created_at'], name='casualpay_period_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='casualpayment',
+            index=models.Index(fields=['employee', 'status'], name='casualpay_emp_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='casualpayment',
+            index=models.Index(fields=['payment_date'], name='casualpay_payment_date_idx'),
+        ),
+    ]
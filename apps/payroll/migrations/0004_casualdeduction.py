@@ -0,0 +1,87 @@
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils.dateparse import parse_datetime
+
+
+def copy_deduction_details(apps, schema_editor):
+    """Expand each payment's deduction_details JSON list into CasualDeduction rows."""
+    CasualPayment = apps.get_model('payroll', 'CasualPayment')
+    CasualDeduction = apps.get_model('payroll', 'CasualDeduction')
+    deductions, added_at = [], []
+    payments = CasualPayment.objects.exclude(deduction_details=[]).values_list('id', 'deduction_details')
+    for payment_id, details in payments.iterator():
+        for detail in details or []:
+            deductions.append(CasualDeduction(
+                casual_payment_id=payment_id,
+                category=detail.get('category') or 'Other',
+                amount=Decimal(str(detail.get('amount') or 0)),
+                reason=detail.get('reason') or '',
+                description=detail.get('description') or ''
+            ))
+            added_at.append(parse_datetime(detail['date_added']) if detail.get('date_added') else None)
+    CasualDeduction.objects.bulk_create(deductions, batch_size=1000)
+    # created_at is auto_now_add, so restore the original dates in a second pass
+    dated = []
+    for deduction, date_added in zip(deductions, added_at):
+        if date_added:
+            deduction.created_at = date_added
+            dated.append(deduction)
+    CasualDeduction.objects.bulk_update(dated, ['created_at'], batch_size=1000)
+
+
+def restore_deduction_details(apps, schema_editor):
+    """Rebuild the deduction_details JSON lists from CasualDeduction rows."""
+    CasualPayment = apps.get_model('payroll', 'CasualPayment')
+    CasualDeduction = apps.get_model('payroll', 'CasualDeduction')
+    details = {}
+    for deduction in CasualDeduction.objects.order_by('casual_payment_id', 'created_at').iterator():
+        details.setdefault(deduction.casual_payment_id, []).append({
+            'category': deduction.category,
+            'amount': float(deduction.amount),
+            'reason': deduction.reason,
+            'description': deduction.description,
+            'date_added': deduction.created_at.isoformat()
+        })
+    payments = list(CasualPayment.objects.filter(pk__in=details))
+    for payment in payments:
+        payment.deduction_details = details[payment.pk]
+    CasualPayment.objects.bulk_update(payments, ['deduction_details'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0003_payroll_list_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CasualDeduction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('deleted_at', models.DateTimeField(blank=True, null=True, verbose_name='deleted at')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True, verbose_name='updated at')),
+                ('category', models.CharField(max_length=100, verbose_name='category')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='amount')),
+                ('reason', models.CharField(max_length=200, verbose_name='reason')),
+                ('description', models.TextField(blank=True, verbose_name='description')),
+                ('casual_payment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deductions', to='payroll.casualpayment', verbose_name='casual payment')),
+                ('deleted_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deleted_%(class)ss', to=settings.AUTH_USER_MODEL, verbose_name='deleted by')),
+            ],
+            options={
+                'verbose_name': 'casual deduction',
+                'verbose_name_plural': 'casual deductions',
+                'ordering': ['created_at'],
+            },
+        ),
+        migrations.RunPython(copy_deduction_details, restore_deduction_details),
+        migrations.RemoveField(
+            model_name='casualpayment',
+            name='deduction_details',
+        ),
+    ]
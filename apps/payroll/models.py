@@ -1,5 +1,11 @@
-from django.db import models
-from django.db.models import Sum, Q
+import secrets
+from decimal import Decimal
+
+from django.contrib.postgres.indexes import GinIndex
+from django.core.cache import cache
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, DecimalField, DurationField, ExpressionWrapper, F, Q, Sum, Value
+from django.db.models.functions import Cast, Coalesce, Extract, Least
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
@@ -10,6 +16,58 @@ from apps.accounting.models import Expense, Revenue
 from apps.base.models import TimestampedModel, SoftDeleteModel
 
 
+GENERATED_NUMBER_ATTEMPTS = 5
+
+
+def _save_with_generated_number(instance, field, generate, save):
+    """
+    Set `field` from generate() and save, regenerating on the rare unique collision.
+
+    The column's unique constraint does the checking instead of an EXISTS
+    query per attempt; the savepoint keeps a collision from aborting an
+    enclosing transaction. Only a clash on the number is retried; any other
+    IntegrityError is raised at once with the field cleared, so the next
+    save() generates a fresh number.
+    """
+    manager = type(instance)._default_manager
+    for attempt in range(GENERATED_NUMBER_ATTEMPTS):
+        number = generate()
+        setattr(instance, field, number)
+        try:
+            with transaction.atomic():
+                return save()
+        except IntegrityError:
+            # Probing after a failure costs one query only on this rare path
+            if attempt == GENERATED_NUMBER_ATTEMPTS - 1 or not manager.filter(**{field: number}).exists():
+                setattr(instance, field, '')
+                raise
+
+ACCOUNTING_CATEGORY_CACHE_TIMEOUT = 300
+
+
+def _accounting_category_id(model, name, description):
+    """Id of the named Expense/RevenueCategory, created if missing, cached in Django's cache."""
+    key = f'payroll_category_id:{model._meta.label_lower}:{name}'
+    category_id = cache.get(key)
+    if category_id is None:
+        category_id = model.objects.filter(name=name).values_list('id', flat=True).first()
+        if category_id is None:
+            category_id = model.objects.get_or_create(name=name, defaults={'description': description})[0].pk
+        cache.set(key, category_id, ACCOUNTING_CATEGORY_CACHE_TIMEOUT)
+    return category_id
+
+class PayrollPeriodQuerySet(models.QuerySet):
+    def with_totals(self):
+        """Annotate `_total_payroll` and `_employee_count` for every period in one GROUP BY."""
+        return self.annotate(
+            _total_payroll=Coalesce(
+                Sum('employee_payrolls__net_pay'),
+                Value(0),
+                output_field=DecimalField(max_digits=12, decimal_places=2)
+            ),
+            _employee_count=Count('employee_payrolls')
+        )
+
 class PayrollPeriod(TimestampedModel, SoftDeleteModel):
     """Period for payroll processing."""
     start_date = models.DateField(_('start date'))
@@ -42,6 +100,8 @@ class PayrollPeriod(TimestampedModel, SoftDeleteModel):
         verbose_name=_('last modified by')
     )
 
+    objects = PayrollPeriodQuerySet.as_manager()
+
     class Meta:
         verbose_name = _('payroll period')
         verbose_name_plural = _('payroll periods')
@@ -58,8 +118,17 @@ class PayrollPeriod(TimestampedModel, SoftDeleteModel):
 
     def get_total_payroll(self):
         """Get total payroll amount for this period."""
+        # Annotated by PayrollPeriod.objects.with_totals()
+        if hasattr(self, '_total_payroll'):
+            return self._total_payroll
         return self.employee_payrolls.aggregate(total=Sum('net_pay'))['total'] or 0
 
+    def get_employee_count(self):
+        """Get number of employee payrolls in this period."""
+        if hasattr(self, '_employee_count'):
+            return self._employee_count
+        return self.employee_payrolls.count()
+
     def get_employees_for_payroll(self):
         """Get employees eligible for payroll in this period."""
         if self.branch:
@@ -126,10 +195,72 @@ class PayrollItem(TimestampedModel, SoftDeleteModel):
         verbose_name = _('payroll item')
         verbose_name_plural = _('payroll items')
         ordering = ['name']
+        indexes = [
+            # Serves applicable_employment_types__contains (@>) lookups
+            GinIndex(fields=['applicable_employment_types'], opclasses=['jsonb_path_ops'], name='payrollitem_emp_types_gin'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.get_item_type_display()})"
 
+class PayrollRunContext:
+    """
+    The PayrollItems for one payroll run, loaded with a single query.
+
+    rates_for() folds them per (branch, employment type) once, so every
+    employee sharing both is priced with two multiplications instead of a
+    loop over the items.
+    """
+    def __init__(self, employee=None):
+        # Soft-deleted items are the inactive ones; PayrollItem has no is_active flag
+        items = PayrollItem.objects.filter(
+            item_type__in=EmployeePayroll.CALCULATED_ITEM_TYPES,
+            deleted_at__isnull=True
+        )
+        if employee is not None:
+            # A single employee only needs the rows that apply to them
+            items = items.filter(
+                Q(branch_id=employee.branch_id) | Q(branch__isnull=True),
+                Q(applicable_employment_types__contains=[employee.employment_type]) | Q(applicable_employment_types=[])
+            )
+        self.items = list(items)
+        self._rates = {}
+
+    def rates_for(self, branch_id, employment_type):
+        """
+        Return ((fixed, percentage) added to gross pay, (fixed, percentage) deducted)
+        summed over the items applicable to an employee.
+        """
+        key = (branch_id, employment_type)
+        if key not in self._rates:
+            # [fixed, percentage] for allowances/bonuses, then deductions/taxes
+            additions, deductions = [Decimal('0'), Decimal('0')], [Decimal('0'), Decimal('0')]
+            for item in self.items:
+                # Items limited to other employment types or another branch don't apply
+                if item.applicable_employment_types and employment_type not in item.applicable_employment_types:
+                    continue
+                if item.branch_id is not None and item.branch_id != branch_id:
+                    continue
+                totals = additions if item.item_type in ('allowance', 'bonus') else deductions
+                if item.is_percentage:
+                    totals[1] += item.percentage
+                else:
+                    totals[0] += item.amount
+            self._rates[key] = (tuple(additions), tuple(deductions))
+        return self._rates[key]
+
+class EmployeePayrollQuerySet(models.QuerySet):
+    def for_calculation(self):
+        """Join everything calculate_payroll() and the payroll serializer read from related rows."""
+        return self.select_related(
+            'employee__user',
+            'employee__branch',
+            'employee__current_rate_structure',
+            'employee__role',
+            'rate_structure',
+            'payroll_period__branch'
+        )
+
 class EmployeePayroll(TimestampedModel, SoftDeleteModel):
     """Payroll record for an employee."""
     employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='payrolls', verbose_name=_('employee'))
@@ -160,11 +291,21 @@ class EmployeePayroll(TimestampedModel, SoftDeleteModel):
     last_modified_by = models.ForeignKey(Employee, on_delete=models.SET_NULL, null=True, related_name='modified_employee_payrolls', verbose_name=_('last modified by'))
     expense = models.OneToOneField(Expense, on_delete=models.SET_NULL, null=True, blank=True, related_name='payroll', verbose_name=_('expense'))
 
+    objects = EmployeePayrollQuerySet.as_manager()
+
     class Meta:
         verbose_name = _('employee payroll')
         verbose_name_plural = _('employee payrolls')
         ordering = ['-payroll_period__start_date', 'employee__user__email']
         unique_together = ['employee', 'payroll_period']
+        indexes = [
+            # unique_together leads with employee; period listings lead with the period
+            models.Index(fields=['payroll_period', 'employee'], name='emppayroll_period_emp_idx'),
+            models.Index(fields=['status', 'payment_date'], name='emppayroll_status_paydate_idx'),
+        ]
+
+    # PayrollItem types that calculate_payroll() applies on top of the basic salary
+    CALCULATED_ITEM_TYPES = ('allowance', 'bonus', 'deduction', 'tax')
 
     def __str__(self):
         return f"{self.employee} - {self.payroll_period}"
@@ -176,8 +317,16 @@ class EmployeePayroll(TimestampedModel, SoftDeleteModel):
         if self.status == 'paid' and not self.payment_method:
             raise ValidationError(_('Payment method is required for paid status.'))
 
-    def calculate_payroll(self):
-        """Calculate payroll amounts based on employee's rate structure."""
+    def calculate_payroll(self, context=None):
+        """
+        Calculate payroll amounts based on employee's rate structure.
+
+        Pass a PayrollRunContext when calculating several payrolls so the
+        PayrollItems are queried once for the whole run. Reads the employee,
+        their rate structure and role, and this payroll's rate structure;
+        load payrolls with EmployeePayroll.objects.for_calculation() so
+        those are already joined.
+        """
         # Get the applicable rate structure
         if self.rate_structure:
             self.basic_salary = self.rate_structure.calculate_rate(employee=self.employee)
@@ -188,41 +337,77 @@ class EmployeePayroll(TimestampedModel, SoftDeleteModel):
         self.gross_pay = self.basic_salary
         self.total_deductions = 0
 
-        # Calculate allowances and bonuses
-        for item in PayrollItem.objects.filter(
-            item_type__in=['allowance', 'bonus'],
-            is_active=True
-        ).filter(
-            Q(applicable_employment_types__contains=[self.employee.employment_type]) |
-            Q(applicable_employment_types=[])
-        ).filter(
-            Q(branch=self.employee.branch) | Q(branch__isnull=True)
-        ):
-            if item.is_percentage:
-                amount = self.basic_salary * (item.percentage / 100)
-            else:
-                amount = item.amount
-            self.gross_pay += amount
-
-        # Calculate deductions
-        for item in PayrollItem.objects.filter(
-            item_type__in=['deduction', 'tax'],
-            is_active=True
-        ).filter(
-            Q(applicable_employment_types__contains=[self.employee.employment_type]) |
-            Q(applicable_employment_types=[])
-        ).filter(
-            Q(branch=self.employee.branch) | Q(branch__isnull=True)
-        ):
-            if item.is_percentage:
-                amount = self.basic_salary * (item.percentage / 100)
-            else:
-                amount = item.amount
-            self.total_deductions += amount
+        if context is None:
+            context = PayrollRunContext(self.employee)
+        additions, deductions = context.rates_for(self.employee.branch_id, self.employee.employment_type)
+        # Allowances and bonuses add to gross pay; deductions and taxes are subtracted.
+        # Decimal sums are exact, so pricing the summed rates matches pricing item by item
+        self.gross_pay += self._rate_amount(additions)
+        self.total_deductions += self._rate_amount(deductions)
 
         # Calculate net pay
         self.net_pay = self.gross_pay - self.total_deductions
 
+    def _rate_amount(self, rates):
+        fixed, percentage = rates
+        return fixed + self.basic_salary * (percentage / 100)
+
+    @classmethod
+    def calculate_many(cls, payrolls):
+        """Recalculate several payrolls with one PayrollItem query and one bulk UPDATE."""
+        context = PayrollRunContext()
+        now = timezone.now()
+        for payroll in payrolls:
+            payroll.calculate_payroll(context)
+            # bulk_update() doesn't apply auto_now
+            payroll.updated_at = now
+        cls.objects.bulk_update(
+            payrolls,
+            ['basic_salary', 'gross_pay', 'total_deductions', 'net_pay', 'updated_at'],
+            batch_size=500
+        )
+        return len(payrolls)
+
+    @classmethod
+    def bulk_calculate(cls, period, batch_size=1000):
+        """
+        Create or recalculate the payroll of every employee eligible in `period`.
+
+        One employee query, one existing-payroll query, one PayrollItem query
+        and one upsert per batch, instead of a get_or_create, an item query
+        and a save per employee. Returns (created, updated) counts.
+        """
+        # current_rate reads the rate structure, falling back to the role's base salary
+        employees = period.get_employees_for_payroll().select_related('current_rate_structure', 'role')
+        existing = {
+            payroll.employee_id: payroll
+            for payroll in period.employee_payrolls.select_related('rate_structure')
+        }
+        context = PayrollRunContext()
+        now = timezone.now()
+        payrolls = []
+        for employee in employees:
+            payroll = existing.get(employee.pk)
+            if payroll is None:
+                payroll = cls(employee=employee, payroll_period=period, rate_structure=employee.current_rate_structure)
+            else:
+                payroll.employee = employee
+            payroll.calculate_payroll(context)
+            # bulk_create() doesn't apply auto_now on the update path
+            payroll.updated_at = now
+            payrolls.append(payroll)
+        # Upsert on the unique (employee, payroll_period) pair, which also
+        # covers rows another request inserted since `existing` was read
+        cls.objects.bulk_create(
+            payrolls,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['employee', 'payroll_period'],
+            update_fields=['basic_salary', 'gross_pay', 'total_deductions', 'net_pay', 'updated_at']
+        )
+        updated = sum(1 for payroll in payrolls if payroll.employee_id in existing)
+        return len(payrolls) - updated, updated
+
     def mark_as_paid(self, payment_date=None, payment_method=None, payment_reference=None):
         """Mark the payroll as paid."""
         self.status = 'paid'
@@ -231,14 +416,43 @@ class EmployeePayroll(TimestampedModel, SoftDeleteModel):
             self.payment_method = payment_method
         if payment_reference:
             self.payment_reference = payment_reference
-        self.save()
+        self.save(update_fields=['status', 'payment_date', 'payment_method', 'payment_reference', 'updated_at'])
 
     def cancel(self, notes=None):
         """Cancel the payroll."""
         self.status = 'cancelled'
         if notes:
             self.notes = notes
-        self.save()
+        self.save(update_fields=['status', 'notes', 'updated_at'])
+
+class WorkAssignmentQuerySet(models.QuerySet):
+    def completed_totals(self):
+        """
+        Per-employee `hours` and `payment` over the completed assignments, as values() rows.
+
+        Hours are the actual hours, falling back to the expected hours when
+        none were recorded.
+        """
+        return self.filter(status='completed').order_by().values('employee_id').annotate(
+            hours=Sum(Coalesce('actual_hours', 'expected_hours')),
+            payment=Sum('total_payment')
+        )
+
+    def totals_for_period(self, start, end, employee_ids):
+        """completed_totals() for the given employees' assignments between start and end."""
+        return self.filter(employee_id__in=employee_ids, work_date__range=(start, end)).completed_totals()
+
+    def with_duration(self):
+        """Annotate `_duration_hours`, check-in to check-out in hours, as duration_hours computes it."""
+        duration = ExpressionWrapper(F('check_out_time') - F('check_in_time'), output_field=DurationField())
+        return self.annotate(_duration_hours=Cast(
+            Extract(duration, 'epoch') / 3600,
+            DecimalField(max_digits=8, decimal_places=2)
+        ))
+
+    def overdue(self):
+        """Assignments still open after their work date; the SQL form of is_overdue."""
+        return self.filter(work_date__lt=timezone.now().date()).exclude(status__in=WorkAssignment.CLOSED_STATUSES)
 
 class WorkAssignment(TimestampedModel, SoftDeleteModel):
     """
@@ -251,6 +465,8 @@ class WorkAssignment(TimestampedModel, SoftDeleteModel):
         ('cancelled', _('Cancelled')),
         ('no_show', _('No Show')),
     ]
+    # Statuses an assignment can't become overdue in
+    CLOSED_STATUSES = ('completed', 'cancelled', 'no_show')
 
     employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='work_assignments', verbose_name=_('employee'))
     assignment_number = models.CharField(_('assignment number'), max_length=20, unique=True, help_text=_('Unique assignment identifier'))
@@ -281,40 +497,41 @@ class WorkAssignment(TimestampedModel, SoftDeleteModel):
     approved_by = models.ForeignKey(Employee, on_delete=models.SET_NULL, null=True, blank=True, related_name='approved_assignments', verbose_name=_('approved by'))
     notes = models.TextField(_('notes'), blank=True)
 
+    objects = WorkAssignmentQuerySet.as_manager()
+
     class Meta:
         verbose_name = _('work assignment')
         verbose_name_plural = _('work assignments')
         ordering = ['-work_date', '-start_time']
+        # Also serves employee + work_date lookups as its leading columns
         unique_together = [['employee', 'work_date', 'start_time']]
+        indexes = [
+            models.Index(fields=['-work_date', '-start_time'], name='workassign_date_start_idx'),
+            models.Index(fields=['status', 'work_date'], name='workassign_status_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.assignment_number} - {self.employee} - {self.work_date}"
 
     def save(self, *args, **kwargs):
         """Generate assignment number if not provided."""
-        if not self.assignment_number:
-            self.assignment_number = self.generate_assignment_number()
-        super().save(*args, **kwargs)
+        if self.assignment_number:
+            return super().save(*args, **kwargs)
+        _save_with_generated_number(
+            self, 'assignment_number', self.generate_assignment_number,
+            lambda: super(WorkAssignment, self).save(*args, **kwargs)
+        )
 
     def generate_assignment_number(self):
-        """Generate unique assignment number."""
-        import random
-        import string
-        
-        while True:
-            # Format: A-YYYYMMDD-XXXX (e.g., A-20240115-1234)
-            date_part = timezone.now().strftime('%Y%m%d')
-            random_part = ''.join(random.choices(string.digits, k=4))
-            assignment_number = f"A-{date_part}-{random_part}"
-            
-            if not WorkAssignment.objects.filter(assignment_number=assignment_number).exists():
-                return assignment_number
+        """Generate an assignment number; uniqueness is enforced by the column's constraint."""
+        # Format: A-YYYYMMDD-XXXXXXXX (e.g., A-20240115-9F2C04AB)
+        return f"A-{timezone.now().strftime('%Y%m%d')}-{secrets.token_hex(4).upper()}"
 
     def check_in(self, check_in_time=None):
         """Record check-in time."""
         self.status = 'in_progress'
         self.check_in_time = check_in_time or timezone.now()
-        self.save()
+        self.save(update_fields=['status', 'check_in_time', 'updated_at'])
 
     def check_out(self, check_out_time=None, actual_hours=None):
         """Record check-out time and calculate payment."""
@@ -335,25 +552,28 @@ class WorkAssignment(TimestampedModel, SoftDeleteModel):
                 work_date=self.work_date
             )
         
-        self.save()
+        self.save(update_fields=['status', 'check_out_time', 'actual_hours', 'total_payment', 'updated_at'])
 
     def cancel(self, reason=''):
         """Cancel the assignment."""
         self.status = 'cancelled'
         if reason:
             self.notes = f"Cancelled: {reason}\n{self.notes}"
-        self.save()
+        self.save(update_fields=['status', 'notes', 'updated_at'])
 
     @property
     def is_overdue(self):
         """Check if assignment is overdue."""
-        if self.status in ['completed', 'cancelled', 'no_show']:
+        if self.status in self.CLOSED_STATUSES:
             return False
         return timezone.now().date() > self.work_date
 
     @property
     def duration_hours(self):
         """Calculate actual duration in hours."""
+        # Annotated by WorkAssignment.objects.with_duration(); None when either time is missing
+        if hasattr(self, '_duration_hours'):
+            return self._duration_hours or 0
         if not self.check_in_time or not self.check_out_time:
             return 0
         duration = self.check_out_time - self.check_in_time
@@ -401,7 +621,6 @@ class CasualPayment(TimestampedModel, SoftDeleteModel):
     
     # Deductions and adjustments
     total_deductions = models.DecimalField(_('total deductions'), max_digits=12, decimal_places=2, default=0)
-    deduction_details = models.JSONField(_('deduction details'), default=list, help_text=_('Detailed breakdown of deductions'))
     
     # Final amounts
     gross_amount = models.DecimalField(_('gross amount'), max_digits=12, decimal_places=2, default=0)
@@ -430,29 +649,28 @@ class CasualPayment(TimestampedModel, SoftDeleteModel):
         verbose_name = _('casual payment')
         verbose_name_plural = _('casual payments')
         ordering = ['-period_start_date', '-created_at']
+        indexes = [
+            models.Index(fields=['-period_start_date', '-created_at'], name='casualpay_period_created_idx'),
+            models.Index(fields=['employee', 'status'], name='casualpay_emp_status_idx'),
+            models.Index(fields=['payment_date'], name='casualpay_payment_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.payment_number} - {self.employee} - {self.period_start_date} to {self.period_end_date}"
 
     def save(self, *args, **kwargs):
         """Generate payment number if not provided."""
-        if not self.payment_number:
-            self.payment_number = self.generate_payment_number()
-        super().save(*args, **kwargs)
+        if self.payment_number:
+            return super().save(*args, **kwargs)
+        _save_with_generated_number(
+            self, 'payment_number', self.generate_payment_number,
+            lambda: super(CasualPayment, self).save(*args, **kwargs)
+        )
 
     def generate_payment_number(self):
-        """Generate unique payment number."""
-        import random
-        import string
-        
-        while True:
-            # Format: CP-YYYYMMDD-XXXX (e.g., CP-20240115-1234)
-            date_part = timezone.now().strftime('%Y%m%d')
-            random_part = ''.join(random.choices(string.digits, k=4))
-            payment_number = f"CP-{date_part}-{random_part}"
-            
-            if not CasualPayment.objects.filter(payment_number=payment_number).exists():
-                return payment_number
+        """Generate a payment number; uniqueness is enforced by the column's constraint."""
+        # Format: CP-YYYYMMDD-XXXXXXXX (e.g., CP-20240115-9F2C04AB)
+        return f"CP-{timezone.now().strftime('%Y%m%d')}-{secrets.token_hex(4).upper()}"
 
     def calculate_payment(self):
         """Calculate all payment components."""
@@ -473,25 +691,35 @@ class CasualPayment(TimestampedModel, SoftDeleteModel):
 
     def add_deduction(self, category, amount, reason, description=''):
         """Add a deduction to the payment."""
-        deduction = {
-            'category': category,
-            'amount': float(amount),
-            'reason': reason,
-            'description': description,
-            'date_added': timezone.now().isoformat()
-        }
-        
-        self.deduction_details.append(deduction)
+        # One INSERT and one UPDATE computed in SQL; earlier deductions aren't rewritten
+        net_amount = F('gross_amount') - F('total_deductions') - amount
+        with transaction.atomic():
+            CasualDeduction.objects.create(
+                casual_payment=self,
+                category=category,
+                amount=amount,
+                reason=reason,
+                description=description
+            )
+            CasualPayment.objects.filter(pk=self.pk).update(
+                total_deductions=F('total_deductions') + amount,
+                net_amount=net_amount,
+                amount_paid=Least('amount_paid', net_amount),
+                amount_held=net_amount - Least('amount_paid', net_amount),
+                updated_at=timezone.now()
+            )
+        # Same arithmetic as calculate_payment(), applied to this instance without re-reading the row
         self.total_deductions += amount
-        self.calculate_payment()
-        self.save()
+        self.net_amount = self.gross_amount - self.total_deductions
+        self.amount_paid = min(self.net_amount, self.amount_paid)
+        self.amount_held = self.net_amount - self.amount_paid
 
     def approve(self, approved_by):
         """Approve the payment."""
         self.status = 'approved'
         self.approved_by = approved_by
         self.approved_date = timezone.now()
-        self.save()
+        self.save(update_fields=['status', 'approved_by', 'approved_date', 'updated_at'])
 
     def mark_as_paid(self, payment_date=None, payment_method=None, payment_reference=None, partial_amount=None):
         """Mark the payment as paid (full or partial)."""
@@ -512,7 +740,10 @@ class CasualPayment(TimestampedModel, SoftDeleteModel):
         
         # Create accounting entries
         self.create_accounting_entries()
-        self.save()
+        self.save(update_fields=[
+            'amount_paid', 'amount_held', 'status', 'payment_date', 'payment_method',
+            'payment_reference', 'expense', 'deduction_revenue', 'updated_at'
+        ])
 
     def create_accounting_entries(self):
         """Create accounting entries for payment and deductions."""
@@ -520,14 +751,11 @@ class CasualPayment(TimestampedModel, SoftDeleteModel):
         
         # Create expense entry for payment
         if not self.expense and self.amount_paid > 0:
-            expense_category, _ = ExpenseCategory.objects.get_or_create(
-                name='Casual Worker Payments',
-                defaults={'description': 'Payments to casual workers'}
-            )
-            
             self.expense = Expense.objects.create(
                 expense_type='casual_payment',
-                category=expense_category,
+                category_id=_accounting_category_id(
+                    ExpenseCategory, 'Casual Worker Payments', 'Payments to casual workers'
+                ),
                 amount=self.amount_paid,
                 expense_date=self.payment_date or timezone.now().date(),
                 description=f"Casual payment for {self.employee} - {self.period_start_date} to {self.period_end_date}",
@@ -538,14 +766,11 @@ class CasualPayment(TimestampedModel, SoftDeleteModel):
 
         # Create revenue entry for deductions (if any)
         if not self.deduction_revenue and self.total_deductions > 0:
-            revenue_category, _ = RevenueCategory.objects.get_or_create(
-                name='Employee Deductions',
-                defaults={'description': 'Deductions from employee payments'}
-            )
-            
             self.deduction_revenue = Revenue.objects.create(
                 revenue_type='employee_deduction',
-                category=revenue_category,
+                category_id=_accounting_category_id(
+                    RevenueCategory, 'Employee Deductions', 'Deductions from employee payments'
+                ),
                 amount=self.total_deductions,
                 revenue_date=self.payment_date or timezone.now().date(),
                 description=f"Deductions from {self.employee} - {self.period_start_date} to {self.period_end_date}",
@@ -559,7 +784,7 @@ class CasualPayment(TimestampedModel, SoftDeleteModel):
         self.status = 'cancelled'
         if reason:
             self.notes = f"Cancelled: {reason}\n{self.notes}"
-        self.save()
+        self.save(update_fields=['status', 'notes', 'updated_at'])
 
     @property
     def is_partially_paid(self):
@@ -571,3 +796,18 @@ class CasualPayment(TimestampedModel, SoftDeleteModel):
         """Get outstanding amount."""
         return self.net_amount - self.amount_paid
 
+class CasualDeduction(TimestampedModel, SoftDeleteModel):
+    """A single deduction from a casual payment; rows are only ever appended."""
+    casual_payment = models.ForeignKey(CasualPayment, on_delete=models.CASCADE, related_name='deductions', verbose_name=_('casual payment'))
+    category = models.CharField(_('category'), max_length=100)
+    amount = models.DecimalField(_('amount'), max_digits=12, decimal_places=2)
+    reason = models.CharField(_('reason'), max_length=200)
+    description = models.TextField(_('description'), blank=True)
+
+    class Meta:
+        verbose_name = _('casual deduction')
+        verbose_name_plural = _('casual deductions')
+        ordering = ['created_at']
+
+    def __str__(self):
+        return f"{self.category}: {self.amount} ({self.casual_payment_id})"
@@ -44,7 +44,7 @@ class PayrollPeriodSerializer(serializers.ModelSerializer):
     
     def get_employee_count(self, obj):
         """Get number of employees in this payroll period."""
-        return obj.employee_payrolls.count()
+        return obj.get_employee_count()
 
 
 class PayrollPeriodCreateSerializer(serializers.ModelSerializer):
@@ -164,12 +164,26 @@ class CasualPaymentSerializer(serializers.ModelSerializer):
     approved_by_name = serializers.CharField(source='approved_by.full_name', read_only=True)
     is_partially_paid = serializers.ReadOnlyField()
     outstanding_amount = serializers.ReadOnlyField()
+    deduction_details = serializers.SerializerMethodField()
     
     class Meta:
         model = CasualPayment
         fields = '__all__'
         read_only_fields = ('payment_number', 'created_by', 'approved_by', 'approved_date', 'expense', 'deduction_revenue')
     
+    def get_deduction_details(self, obj):
+        """The payment's CasualDeduction rows, in the shape the old JSON list had."""
+        return [
+            {
+                'category': deduction.category,
+                'amount': float(deduction.amount),
+                'reason': deduction.reason,
+                'description': deduction.description,
+                'date_added': deduction.created_at.isoformat()
+            }
+            for deduction in obj.deductions.all()
+        ]
+    
     def create(self, validated_data):
         """Create casual payment with automatic calculation."""
         payment = super().create(validated_data)
@@ -210,17 +224,13 @@ class CasualPaymentCreateSerializer(serializers.ModelSerializer):
         
         # If work assignments provided, calculate from them
         if work_assignments:
-            assignments = WorkAssignment.objects.filter(
+            # Summed in the database rather than by loading each assignment
+            totals = WorkAssignment.objects.filter(
                 id__in=work_assignments,
-                employee=payment.employee,
-                status='completed'
-            )
-            
-            total_hours = 0
-            for assignment in assignments:
-                total_hours += assignment.actual_hours or assignment.expected_hours
+                employee=payment.employee
+            ).completed_totals().first()
             
-            payment.total_hours_worked = total_hours
+            payment.total_hours_worked = totals['hours'] if totals else 0
             payment.calculate_payment()
             payment.save()
         
@@ -0,0 +1,79 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from apps.employees.models import Employee
+from apps.payroll.models import EmployeePayroll, PayrollItem, PayrollPeriod
+
+User = get_user_model()
+
+
+def make_employee(number, custom_rate, employment_type='FT', is_active=True):
+    user = User.objects.create_user(
+        email=f'employee{number}@example.com',
+        password='testpass123',
+        first_name='Employee',
+        last_name=str(number)
+    )
+    return Employee.objects.create(
+        user=user,
+        employee_id=f'EMP{number:03d}',
+        employment_type=employment_type,
+        custom_rate=custom_rate,
+        is_active=is_active
+    )
+
+
+class BulkCalculateTests(TestCase):
+    """EmployeePayroll.bulk_calculate() against per-row calculate_payroll()."""
+
+    def setUp(self):
+        self.period = PayrollPeriod.objects.create(start_date=date(2025, 1, 1), end_date=date(2025, 1, 31))
+        self.first = make_employee(1, Decimal('1000.00'))
+        self.second = make_employee(2, Decimal('2500.00'), employment_type='PT')
+        self.inactive = make_employee(3, Decimal('900.00'), is_active=False)
+        PayrollItem.objects.create(name='Transport', item_type='allowance', amount=Decimal('150.00'))
+        PayrollItem.objects.create(name='Bonus', item_type='bonus', is_percentage=True, percentage=Decimal('5.00'),
+                                   applicable_employment_types=['FT'])
+        PayrollItem.objects.create(name='PAYE', item_type='tax', is_percentage=True, percentage=Decimal('10.00'))
+        PayrollItem.objects.create(name='Welfare', item_type='deduction', amount=Decimal('50.00'))
+        # A stale row that bulk_calculate() must update in place
+        self.existing = EmployeePayroll.objects.create(employee=self.first, payroll_period=self.period, net_pay=Decimal('1.00'))
+
+    def expected(self, employee):
+        payroll = EmployeePayroll(employee=employee, payroll_period=self.period, rate_structure=employee.current_rate_structure)
+        payroll.calculate_payroll()
+        return payroll
+
+    def assertMatchesCalculate(self, employee):
+        stored = EmployeePayroll.objects.get(employee=employee, payroll_period=self.period)
+        expected = self.expected(employee)
+        for field in ('basic_salary', 'gross_pay', 'total_deductions', 'net_pay'):
+            self.assertEqual(getattr(stored, field), getattr(expected, field), field)
+
+    def test_counts_created_and_updated(self):
+        created, updated = EmployeePayroll.bulk_calculate(self.period)
+        self.assertEqual((created, updated), (1, 1))
+        self.assertEqual(self.period.employee_payrolls.count(), 2)
+        self.assertFalse(self.period.employee_payrolls.filter(employee=self.inactive).exists())
+
+    def test_amounts_match_calculate_payroll(self):
+        EmployeePayroll.bulk_calculate(self.period)
+        self.assertMatchesCalculate(self.first)
+        self.assertMatchesCalculate(self.second)
+        # FT: 1000 + 150 + 5% bonus; 10% tax + 50
+        stored = EmployeePayroll.objects.get(pk=self.existing.pk)
+        self.assertEqual(stored.gross_pay, Decimal('1200.00'))
+        self.assertEqual(stored.total_deductions, Decimal('150.00'))
+        self.assertEqual(stored.net_pay, Decimal('1050.00'))
+
+    def test_rerun_updates_every_row(self):
+        EmployeePayroll.bulk_calculate(self.period)
+        self.assertEqual(EmployeePayroll.bulk_calculate(self.period), (0, 2))
+        self.assertEqual(self.period.employee_payrolls.count(), 2)
+
+    def test_small_batches(self):
+        self.assertEqual(EmployeePayroll.bulk_calculate(self.period, batch_size=1), (1, 1))
+        self.assertMatchesCalculate(self.second)
@@ -0,0 +1,144 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.utils.dateparse import parse_datetime
+
+from apps.employees.models import Employee
+from apps.payroll.models import CasualPayment
+
+User = get_user_model()
+
+
+class AddDeductionTests(TestCase):
+    """CasualPayment.add_deduction() keeps the row, the instance and calculate_payment() in step."""
+
+    def setUp(self):
+        user = User.objects.create_user(email='casual@example.com', password='testpass123', first_name='Casual', last_name='Worker')
+        self.employee = Employee.objects.create(user=user, employee_id='CAS001', employment_type='CASUAL')
+        self.payment = CasualPayment(
+            employee=self.employee,
+            period_start_date=date(2025, 1, 1),
+            period_end_date=date(2025, 1, 1),
+            total_hours_worked=Decimal('8.00'),
+            hourly_rate=Decimal('125.00')
+        )
+        self.payment.calculate_payment()
+        self.payment.save()
+
+    def assertStoredMatchesInstance(self):
+        stored = CasualPayment.objects.get(pk=self.payment.pk)
+        for field in ('total_deductions', 'net_amount', 'amount_paid', 'amount_held'):
+            self.assertEqual(getattr(stored, field), getattr(self.payment, field), field)
+        return stored
+
+    def test_deductions_accumulate(self):
+        self.payment.add_deduction('Damage', Decimal('100.00'), 'Broken glass')
+        self.payment.add_deduction('Lateness', Decimal('50.00'), 'Late by an hour', description='Shift start 08:00')
+        stored = self.assertStoredMatchesInstance()
+        self.assertEqual(stored.total_deductions, Decimal('150.00'))
+        self.assertEqual(stored.net_amount, Decimal('850.00'))
+        self.assertEqual(stored.amount_paid, Decimal('0.00'))
+        self.assertEqual(stored.amount_held, Decimal('850.00'))
+        self.assertEqual(
+            list(stored.deductions.values_list('category', 'amount', 'reason', 'description')),
+            [
+                ('Damage', Decimal('100.00'), 'Broken glass', ''),
+                ('Lateness', Decimal('50.00'), 'Late by an hour', 'Shift start 08:00'),
+            ]
+        )
+
+    def test_caps_amount_paid_at_new_net(self):
+        # Fully paid before the deduction came in
+        self.payment.amount_paid = self.payment.net_amount
+        self.payment.amount_held = Decimal('0.00')
+        self.payment.save()
+        self.payment.add_deduction('Advance', Decimal('200.00'), 'Salary advance')
+        stored = self.assertStoredMatchesInstance()
+        self.assertEqual(stored.amount_paid, Decimal('800.00'))
+        self.assertEqual(stored.amount_held, Decimal('0.00'))
+
+    def test_matches_calculate_payment(self):
+        self.payment.amount_paid = Decimal('300.00')
+        self.payment.save()
+        self.payment.add_deduction('Damage', Decimal('120.00'), 'Broken plate')
+        stored = self.assertStoredMatchesInstance()
+        stored.calculate_payment()
+        self.assertEqual(stored.net_amount, self.payment.net_amount)
+        self.assertEqual(stored.amount_held, self.payment.amount_held)
+
+
+class CasualDeductionMigrationTests(TransactionTestCase):
+    """0004 turns deduction_details JSON into CasualDeduction rows and back."""
+
+    before = [('payroll', '0003_payroll_list_indexes')]
+    after = [('payroll', '0004_casualdeduction')]
+
+    def setUp(self):
+        self.executor = MigrationExecutor(connection)
+        self.executor.migrate(self.before)
+        self.executor.loader.build_graph()
+        old_apps = self.executor.loader.project_state(self.before).apps
+        OldUser = old_apps.get_model('accounts', 'User')
+        OldEmployee = old_apps.get_model('employees', 'Employee')
+        OldCasualPayment = old_apps.get_model('payroll', 'CasualPayment')
+        user = OldUser.objects.create(email='migrated@example.com', password='!', first_name='Casual', last_name='Worker')
+        employee = OldEmployee.objects.create(user=user, employee_id='CAS002')
+        self.payment_id = OldCasualPayment.objects.create(
+            employee=employee,
+            payment_number='CP-20250101-0000000A',
+            period_start_date=date(2025, 1, 1),
+            period_end_date=date(2025, 1, 1),
+            total_deductions=Decimal('75.50'),
+            deduction_details=[
+                {'category': 'Damage', 'amount': 50.0, 'reason': 'Broken glass',
+                 'description': '', 'date_added': '2025-01-01T10:00:00+00:00'},
+                {'category': 'Lateness', 'amount': 25.5, 'reason': 'Late',
+                 'description': 'Ten minutes', 'date_added': '2025-01-01T12:30:00+00:00'},
+            ]
+        ).pk
+        OldCasualPayment.objects.create(
+            employee=employee,
+            payment_number='CP-20250102-0000000B',
+            period_start_date=date(2025, 1, 2),
+            period_end_date=date(2025, 1, 2),
+        )
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def migrate(self, targets):
+        self.executor.loader.build_graph()
+        self.executor.migrate(targets)
+        return self.executor.loader.project_state(targets).apps
+
+    def test_forward_copies_details_into_rows(self):
+        new_apps = self.migrate(self.after)
+        NewCasualDeduction = new_apps.get_model('payroll', 'CasualDeduction')
+        rows = list(NewCasualDeduction.objects.order_by('created_at').values_list(
+            'casual_payment_id', 'category', 'amount', 'reason', 'description', 'created_at'
+        ))
+        self.assertEqual(rows, [
+            (self.payment_id, 'Damage', Decimal('50.00'), 'Broken glass', '',
+             parse_datetime('2025-01-01T10:00:00+00:00')),
+            (self.payment_id, 'Lateness', Decimal('25.50'), 'Late', 'Ten minutes',
+             parse_datetime('2025-01-01T12:30:00+00:00')),
+        ])
+
+    def test_backward_rebuilds_details(self):
+        self.migrate(self.after)
+        old_apps = self.migrate(self.before)
+        OldCasualPayment = old_apps.get_model('payroll', 'CasualPayment')
+        payment = OldCasualPayment.objects.get(pk=self.payment_id)
+        self.assertEqual(
+            [(detail['category'], detail['amount'], parse_datetime(detail['date_added'])) for detail in payment.deduction_details],
+            [
+                ('Damage', 50.0, parse_datetime('2025-01-01T10:00:00+00:00')),
+                ('Lateness', 25.5, parse_datetime('2025-01-01T12:30:00+00:00')),
+            ]
+        )
+        self.assertEqual(OldCasualPayment.objects.filter(deduction_details=[]).count(), 1)
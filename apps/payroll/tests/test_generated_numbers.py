@@ -0,0 +1,49 @@
+from datetime import date, time
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.test import TestCase
+
+from apps.employees.models import Employee
+from apps.payroll.models import GENERATED_NUMBER_ATTEMPTS, WorkAssignment
+
+User = get_user_model()
+
+
+class GeneratedNumberTests(TestCase):
+    """Only a clash on the generated number is retried."""
+
+    def setUp(self):
+        user = User.objects.create_user(email='numbers@example.com', password='testpass123', first_name='Casual', last_name='Worker')
+        self.employee = Employee.objects.create(user=user, employee_id='CAS003', employment_type='CASUAL')
+        self.first = self.assignment()
+        self.first.save()
+
+    def assignment(self):
+        return WorkAssignment(
+            employee=self.employee,
+            work_date=date(2025, 1, 1),
+            start_time=time(8, 0),
+            expected_hours=Decimal('8.00'),
+            work_description='Kitchen prep'
+        )
+
+    def test_number_clash_is_retried(self):
+        numbers = iter([self.first.assignment_number, 'A-20250101-0000000B'])
+        duplicate_slot = self.assignment()
+        duplicate_slot.start_time = time(14, 0)
+        with mock.patch.object(WorkAssignment, 'generate_assignment_number', side_effect=lambda: next(numbers)):
+            duplicate_slot.save()
+        self.assertEqual(duplicate_slot.assignment_number, 'A-20250101-0000000B')
+
+    def test_other_integrity_errors_are_not_retried(self):
+        duplicate = self.assignment()
+        generate = mock.Mock(side_effect=['A-20250101-0000000C'] * GENERATED_NUMBER_ATTEMPTS)
+        with mock.patch.object(WorkAssignment, 'generate_assignment_number', generate):
+            with self.assertRaises(IntegrityError):
+                duplicate.save()
+        self.assertEqual(generate.call_count, 1)
+        # Cleared so the next save() generates a number again
+        self.assertEqual(duplicate.assignment_number, '')
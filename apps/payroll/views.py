@@ -12,7 +12,7 @@ User = get_user_model()
 
 from apps.payroll.models import (
     PayrollPeriod, PayrollItem, EmployeePayroll, WorkAssignment, 
-    CasualPayment, DeductionCategory
+    CasualPayment, DeductionCategory, CasualDeduction
 )
 from apps.payroll.utils import (
     get_or_create_payroll_period,
@@ -81,6 +81,9 @@ class PayrollPeriodViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(branch_id=branch_id)
         if status:
             queryset = queryset.filter(status=status)
+        if self.action in ('list', 'retrieve'):
+            # total_payroll and employee_count for the whole page in one GROUP BY
+            queryset = queryset.with_totals()
             
         return queryset
 
@@ -144,32 +147,8 @@ class PayrollPeriodViewSet(viewsets.ModelViewSet):
         """
         Process payroll for all employees in the given period.
         """
-        # Get all active employees for the branch (or all if no branch)
-        employees = Employee.objects.filter(is_active=True)
-        if period.branch:
-            employees = employees.filter(branch=period.branch)
-        
-        created_count = 0
-        updated_count = 0
-        
-        for employee in employees:
-            # Get or create employee payroll for this period
-            employee_payroll, created = EmployeePayroll.objects.get_or_create(
-                employee=employee,
-                payroll_period=period,
-                defaults={
-                    'rate_structure': employee.rate_structure
-                }
-            )
-            
-            # Calculate payroll
-            employee_payroll.calculate_payroll()
-            employee_payroll.save()
-            
-            if created:
-                created_count += 1
-            else:
-                updated_count += 1
+        # Every active employee of the period's branch (or all if no branch), in bulk
+        created_count, updated_count = EmployeePayroll.bulk_calculate(period)
         
         # Process casual payments for this period
         casual_payments = CasualPayment.objects.filter(
@@ -181,17 +160,18 @@ class PayrollPeriodViewSet(viewsets.ModelViewSet):
         if period.branch:
             casual_payments = casual_payments.filter(employee__branch=period.branch)
         
-        for payment in casual_payments:
-            # Update payment status if needed
-            if payment.status == 'pending':
-                payment.status = 'approved'
-                payment.approved_by = getattr(request.user, 'employee', None)
-                payment.approved_date = timezone.now()
-                payment.save()
+        # Approve the pending ones in a single UPDATE rather than a save per payment
+        now = timezone.now()
+        casual_payments.filter(status='pending').update(
+            status='approved',
+            approved_by=getattr(request.user, 'employee', None),
+            approved_date=now,
+            updated_at=now
+        )
         
         # Update period status
         period.status = 'processing'
-        period.save()
+        period.save(update_fields=['status', 'updated_at'])
         
         return Response({
             'message': f'Payroll processed for {created_count + updated_count} employees',
@@ -319,6 +299,10 @@ class EmployeePayrollViewSet(viewsets.ModelViewSet):
     ordering_fields = ['gross_pay', 'net_pay', 'payment_date', 'created_at']
     ordering = ['-payroll_period__start_date', 'employee__user__last_name']
 
+    def get_queryset(self):
+        # calculate/update recalculate and every action renders employee, branch and period
+        return super().get_queryset().for_calculation()
+
     @action(detail=True, methods=['post'])
     def calculate(self, request, pk=None):
         """Recalculate payroll for this employee."""
@@ -380,6 +364,16 @@ class WorkAssignmentViewSet(viewsets.ModelViewSet):
     ordering_fields = ['work_date', 'start_time', 'expected_hours', 'created_at']
     ordering = ['-work_date', '-start_time']
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'check_out':
+            # check_out() prices the work through employee.calculate_payment()
+            queryset = queryset.select_related('employee__current_rate_structure', 'employee__role')
+        elif self.action in ('list', 'retrieve', 'overdue', 'today'):
+            # duration_hours for every row computed by the database
+            queryset = queryset.with_duration()
+        return queryset
+
     @action(detail=True, methods=['post'])
     def check_in(self, request, pk=None):
         """Check in to work assignment."""
@@ -412,10 +406,7 @@ class WorkAssignmentViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def overdue(self, request):
         """Get overdue assignments."""
-        overdue_assignments = self.get_queryset().filter(
-            status__in=['scheduled', 'in_progress'],
-            work_date__lt=timezone.now().date()
-        )
+        overdue_assignments = self.get_queryset().overdue()
         
         serializer = self.get_serializer(overdue_assignments, many=True)
         return Response(serializer.data)
@@ -439,6 +430,10 @@ class CasualPaymentViewSet(viewsets.ModelViewSet):
     ordering_fields = ['period_start_date', 'net_amount', 'payment_date', 'created_at']
     ordering = ['-period_start_date', '-created_at']
 
+    def get_queryset(self):
+        # deduction_details renders every payment's deductions; one query per page
+        return super().get_queryset().prefetch_related('deductions')
+
     def get_serializer_class(self):
         """Use different serializer for creation."""
         if self.action == 'create':
@@ -521,18 +516,12 @@ class CasualPaymentViewSet(viewsets.ModelViewSet):
         if branch_id:
             queryset = queryset.filter(employee__branch_id=branch_id)
         
-        # Aggregate deductions by category
-        deduction_data = {}
-        for payment in queryset:
-            for deduction in payment.deduction_details:
-                category = deduction.get('category', 'Other')
-                amount = deduction.get('amount', 0)
-                
-                if category not in deduction_data:
-                    deduction_data[category] = {'total': 0, 'count': 0}
-                
-                deduction_data[category]['total'] += amount
-                deduction_data[category]['count'] += 1
+        # Aggregate deductions by category in one GROUP BY
+        deduction_data = {
+            row['category']: {'total': row['total'], 'count': row['count']}
+            for row in CasualDeduction.objects.filter(casual_payment__in=queryset.order_by().values('pk'))
+            .order_by().values('category').annotate(total=Sum('amount'), count=Count('pk'))
+        }
         
         # Calculate percentages
         total_deductions = sum(data['total'] for data in deduction_data.values())
@@ -288,6 +288,8 @@ class OrderItem(TimestampedModel, SoftDeleteModel):
             models.Index(fields=['status']),
             models.Index(fields=['kitchen_status']),
             models.Index(fields=['item_type']),
+            # Popular menu items: join on menu_item, then probe the order's status
+            models.Index(fields=['menu_item', 'order'], name='oi_popular_idx', condition=models.Q(item_type='menu_item')),
         ]
     
     def __str__(self):
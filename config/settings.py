@@ -244,11 +244,14 @@ db_url = os.getenv('DATABASE_URL', 'postgresql://postgres:NwdbkRvsAHXMbHBjHKZzXF
 DATABASES = {
     'default': dj_database_url.config(
         default=db_url,
-        conn_max_age=600,
+        conn_max_age=int(os.environ.get('DB_CONN_MAX_AGE', '600')),
         conn_health_checks=True,  # Enable connection health checks
         ssl_require=True
     )
 }
+# Set when DATABASE_URL points at PgBouncer in transaction pooling mode: a
+# server-side cursor (QuerySet.iterator()) can't outlive the pooled transaction
+DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = os.environ.get('DB_PGBOUNCER_TRANSACTION_POOLING', 'False') == 'True'
 
 """
 #else: